@@ -2,70 +2,221 @@
 FastAPI application for LLM Vulnerability Function Localization Web Processing.
 """
 
+import asyncio
 import os
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+import orjson
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse, HTMLResponse, FileResponse
+from fastapi.responses import ORJSONResponse, HTMLResponse, Response, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
-from starlette.middleware.base import BaseHTTPMiddleware
-import threading
-from pydantic import BaseModel
-from typing import Optional
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from pydantic import BaseModel, ConfigDict, field_validator
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
 
 # Import utility modules
 from utils.config_manager import config
-from utils.logging_manager import logger
+from utils.logging_manager import logger, logging_manager
 from utils.json_processor import (
-    process_json_files, get_current_object, set_user_decision,
-    get_current_filename, get_processed_status, reset_processing_state,
-    get_decision_context
+    process_json_files, get_current_view, set_user_decision,
+    get_processed_status, reset_processing_state, request_stop
 )
 from utils.ui_manager import ui_manager, progress, reset_progress
 
 # Create a timestamp for cache busting
-CACHE_BUSTER = str(int(time.time()))
+CACHE_BUSTER = str(time.time_ns())
+
+# Precomputed raw cache control headers, appended as-is to each response.
+# Endpoints that set their own are skipped, so these never need replacing.
+_NOCACHE_HDRS = [
+    (b"cache-control", b"no-store, no-cache, must-revalidate, max-age=0"),
+    (b"pragma", b"no-cache"),
+    (b"expires", b"0"),
+]
+
+# Static URLs carrying the cache buster in their query string change whenever
+# the asset does, so the browser may keep them for a year without revalidating
+_STATIC_HDRS = [(b"cache-control", b"public, max-age=31536000, immutable")]
+
+# Paths that set their own cache headers and are left alone by NoCacheMiddleware
+_SELF_CACHED_PATHS = frozenset({"/favicon.ico"})
 
 # Create a middleware to add cache control headers
-class NoCacheMiddleware(BaseHTTPMiddleware):
-    """Middleware to add cache control headers to all responses."""
+class NoCacheMiddleware:
+    """Pure ASGI middleware to add cache control headers to all responses."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
 
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
-        Add cache control headers to all responses.
+        Add cache control headers to all HTTP responses.
 
         Args:
-            request: The incoming request.
-            call_next: The next middleware or route handler.
+            scope: The ASGI connection scope.
+            receive: The ASGI receive channel.
+            send: The ASGI send channel.
+        """
+        if scope["type"] != "http" or scope["path"] in _SELF_CACHED_PATHS:
+            await self.app(scope, receive, send)
+            return
 
-        Returns:
-            The response with cache control headers added.
+        is_versioned_static = scope["path"].startswith("/static/") and bool(scope["query_string"])
+        cache_headers = _STATIC_HDRS if is_versioned_static else _NOCACHE_HDRS
+
+        async def send_with_cache_headers(message: Message) -> None:
+            # Add cache control headers once the response headers are known
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), *cache_headers]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cache_headers)
+
+# Content codings of the precompressed static copies and their file suffixes, preferred first
+_PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+def _accepted_encodings(accept_encoding: str) -> Set[str]:
+    """
+    Parse an Accept-Encoding header into the content codings the client accepts.
+
+    Codings listed with q=0 are refused; "*" stands for every coding not listed.
+
+    Args:
+        accept_encoding: The Accept-Encoding header value.
+
+    Returns:
+        The accepted coding names, lowercased.
+    """
+    accepted: Set[str] = set()
+    refused: Set[str] = set()
+    for token in accept_encoding.split(","):
+        coding, _, params = token.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        (accepted if quality > 0 else refused).add(coding)
+    if "*" in accepted:
+        accepted.update(encoding for encoding, _ in _PRECOMPRESSED_ENCODINGS
+                        if encoding not in refused)
+    return accepted
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles that serves a prebuilt .br or .gz copy of an asset when the client accepts it."""
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
         """
-        response = await call_next(request)
+        Serve the compressed copy of the requested asset if one is usable.
 
-        # Add cache control headers to all responses
-        response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
-        response.headers["Pragma"] = "no-cache"
-        response.headers["Expires"] = "0"
+        A copy is only used when it is at least as new as the asset itself, so a
+        stylesheet rebuilt by the Tailwind watcher is never shadowed by a stale copy.
+        Every response for an asset with compressed copies varies on Accept-Encoding,
+        so a shared cache never hands one client's encoding to another.
 
-        return response
+        Args:
+            path: The requested path, relative to the static directory.
+            scope: The ASGI connection scope.
+
+        Returns:
+            The response for the asset.
+        """
+        if scope["method"] in ("GET", "HEAD"):
+            _, source_stat = await asyncio.to_thread(self.lookup_path, path)
+            if source_stat is not None:
+                accepted = _accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+                has_copies = False
+                for encoding, suffix in _PRECOMPRESSED_ENCODINGS:
+                    full_path, stat_result = await asyncio.to_thread(self.lookup_path, path + suffix)
+                    if stat_result is None:
+                        continue
+                    has_copies = True
+                    if encoding in accepted and stat_result.st_mtime >= source_stat.st_mtime:
+                        # The content type is guessed from the name without the suffix
+                        response = self.file_response(full_path, stat_result, scope)
+                        response.headers["content-encoding"] = encoding
+                        response.headers["vary"] = "Accept-Encoding"
+                        return response
+                if has_copies:
+                    response = await super().get_response(path, scope)
+                    response.headers["vary"] = "Accept-Encoding"
+                    return response
+        return await super().get_response(path, scope)
 
 # Create FastAPI app
-app = FastAPI()
+# Serialize responses with orjson rather than the stdlib json encoder
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Add the no-cache middleware
 app.add_middleware(NoCacheMiddleware)
 
+# Compress dynamic responses. Registered last so it is the outermost middleware;
+# it leaves responses that already carry a Content-Encoding alone.
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop the processing worker, then flush queued log records and stop the logging listener thread."""
+    request_stop()
+    _bg_executor.shutdown(wait=False, cancel_futures=True)
+    logging_manager.shutdown()
+
+@app.on_event("startup")
+async def register_progress_listener():
+    """Forward progress updates, made on the processing thread, to the event loop."""
+    loop = asyncio.get_running_loop()
+
+    def on_progress() -> None:
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(_wake_progress_subscribers)
+
+    progress.add_listener(on_progress)
+
 # Set up Jinja2 templates
 templates = Jinja2Templates(directory="templates")
 
-# Mount static files with cache busting
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# Rendered index page per cache buster value; the page has no other inputs
+_index_cache: Dict[str, bytes] = {}
+
+# Mount static files with cache busting, preferring precompressed copies
+app.mount("/static", PrecompressedStaticFiles(directory="static"), name="static")
+
+# Favicon bytes, read on first request, and the headers they are served with
+_favicon: Optional[bytes] = None
+_FAVICON_HEADERS = {"content-type": "image/x-icon", "cache-control": "public, max-age=86400"}
+
+# A single long-lived worker runs process_json_files; the future tracks the current run
+_bg_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="jsonproc")
+
+@dataclass(frozen=True, slots=True)
+class _ReviewState:
+    """Completion flag and last shown object, replaced as a whole so readers never see half an update."""
+    complete: bool = False
+    last_obj: Optional[dict] = None
 
 # Global variables
-processing_thread = None
-processing_complete = False
-last_processed_object = None
+processing_future: Optional[Future] = None
+_review_state = _ReviewState()
+
+# One event per connected /progress/stream client, set whenever the progress changes
+_progress_subscribers: Set[asyncio.Event] = set()
+
+# Seconds between keep-alive comments on an idle /progress/stream
+_SSE_KEEPALIVE_SECONDS = 15
+
+# Serialized /processed_status body, keyed by the status list it was built from.
+# get_processed_status returns the same list object until the processed files change.
+_processed_status_cache: Optional[Tuple[List[Dict[str, str]], bytes]] = None
 
 # Get input and output directories from config
 INPUT_DIR = config.get_input_dir()
@@ -74,49 +225,78 @@ OUTPUT_DIR = config.get_output_dir()
 # Define Pydantic models for request validation
 class Decision(BaseModel):
     """Model for decision submission."""
-    decision: int | bool | str  # Allow multiple types for decision
+    model_config = ConfigDict(frozen=True)
+
+    decision: int | bool  # Strings are coerced by the validator below
+
+    @field_validator("decision", mode="before")
+    @classmethod
+    def coerce_decision(cls, value):
+        """Accept 'true'/'false' (any case) as booleans and other strings as integers."""
+        if isinstance(value, str):
+            lowered = value.lower()
+            if lowered == 'true':
+                return True
+            if lowered == 'false':
+                return False
+            return int(value)
+        return value
 
 class ErrorLog(BaseModel):
     """Model for frontend error logging."""
+    model_config = ConfigDict(frozen=True)
+
     message: str
     source: str
     stack: Optional[str] = None
 
 @app.get("/favicon.ico")
 async def favicon():
-    """Serve the favicon."""
-    return FileResponse("static/favicon.ico")
+    """Serve the favicon from memory, reading the file only once."""
+    global _favicon
+    if _favicon is None:
+        with open("static/favicon.ico", "rb") as f:
+            _favicon = f.read()
+    return Response(content=_favicon, headers=_FAVICON_HEADERS)
 
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request):
     """Serve the main page."""
     try:
-        # Pass the cache buster to the template
-        return templates.TemplateResponse("index.html", {"request": request, "cache_buster": CACHE_BUSTER})
+        # Render once per cache buster value and serve the stored bytes after that
+        html = _index_cache.get(CACHE_BUSTER)
+        if html is None:
+            html = templates.get_template("index.html").render(cache_buster=CACHE_BUSTER).encode("utf-8")
+            _index_cache[CACHE_BUSTER] = html
+        return HTMLResponse(content=html)
     except Exception as e:
         logger.error(f"Error rendering index: {str(e)}")
-        return JSONResponse(content={"error": "Internal server error"}, status_code=500)
+        return ORJSONResponse(content={"error": "Internal server error"}, status_code=500)
 
 # Certificate help routes removed as they're no longer needed with mkcert
 # Certificates are automatically trusted by the system
 
+def _log_processing_error(future: Future) -> None:
+    """Log an exception raised by a processing run, which the future would otherwise keep to itself."""
+    if not future.cancelled() and future.exception() is not None:
+        logger.error(f"Processing failed: {future.exception()}", exc_info=future.exception())
+
 @app.get("/start_processing")
 async def start_processing():
     """Start processing JSON files."""
-    global processing_thread, processing_complete, last_processed_object
+    global processing_future, _review_state
 
-    if processing_thread is None or not processing_thread.is_alive():
+    if processing_future is None or processing_future.done():
         # Reset processing state
-        processing_complete = False
-        last_processed_object = None
+        _review_state = _ReviewState()
 
         # Reset UI progress and processing state
         reset_progress()
         reset_processing_state()
 
-        # Start processing thread
-        processing_thread = threading.Thread(target=process_json_files, args=(INPUT_DIR, OUTPUT_DIR))
-        processing_thread.start()
+        # Hand the run to the worker thread
+        processing_future = _bg_executor.submit(process_json_files, INPUT_DIR, OUTPUT_DIR)
+        processing_future.add_done_callback(_log_processing_error)
         logger.info("Processing started")
         return {"status": "Processing started"}
     else:
@@ -126,73 +306,108 @@ async def start_processing():
 @app.get("/stop_processing")
 async def stop_processing():
     """Stop processing JSON files."""
-    global processing_thread
-    if processing_thread and processing_thread.is_alive():
-        # Implement a way to stop the processing thread safely
+    if processing_future and not processing_future.done():
+        # The worker finishes the current object, closes its output file and returns
+        request_stop()
         logger.info("Processing stopped")
         return {"status": "Processing stopped"}
     else:
         logger.warning("No processing in progress")
         return {"status": "No processing in progress"}
 
-@app.get("/progress")
-async def get_progress():
-    """Get the current progress."""
-    global processing_complete, last_processed_object
+def _wake_progress_subscribers() -> None:
+    """Wake every /progress/stream so it pushes the new progress."""
+    for event in _progress_subscribers:
+        event.set()
+
+def _progress_payload() -> dict:
+    """Build the progress payload shared by /progress and /progress/stream."""
+    global _review_state
 
     # Get the current progress
     current_progress = progress.get()
+    state = _review_state
 
     # Check if processing is complete
     if (current_progress["total_files"] > 0 and
         current_progress["current_file_index"] == current_progress["total_files"] and
         current_progress["file_progress"] >= 100):
-        if not processing_complete:
-            processing_complete = True
+        if not state.complete:
+            state = _review_state = replace(state, complete=True)
             logger.debug("Processing marked as complete")
 
             # Make sure we have a last processed object
-            if last_processed_object:
-                logger.debug(f"Last processed object preserved: {last_processed_object.get('id', 'unknown')}")
+            if state.last_obj:
+                logger.debug(f"Last processed object preserved: {state.last_obj.get('id', 'unknown')}")
             else:
                 logger.warning("No last processed object available at completion")
 
     # Add processing_complete flag to the response
-    current_progress["processing_complete"] = processing_complete
+    current_progress["processing_complete"] = state.complete
 
     return current_progress
 
+@app.get("/progress")
+async def get_progress():
+    """Get the current progress."""
+    return _progress_payload()
+
+async def _progress_events(request: Request) -> AsyncIterator[bytes]:
+    """Yield a progress message whenever the progress changes."""
+    event = asyncio.Event()
+    _progress_subscribers.add(event)
+    try:
+        last_payload = None
+        while not await request.is_disconnected():
+            # Clear before reading the progress so an update during the read wakes us again
+            event.clear()
+            payload = orjson.dumps(_progress_payload())
+            if payload != last_payload:
+                last_payload = payload
+                yield b"data: " + payload + b"\n\n"
+
+            try:
+                await asyncio.wait_for(event.wait(), timeout=_SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+    finally:
+        _progress_subscribers.discard(event)
+
+@app.get("/progress/stream")
+async def progress_stream(request: Request):
+    """Push the progress as Server-Sent Events; /progress remains available for polling."""
+    return StreamingResponse(
+        _progress_events(request),
+        media_type="text/event-stream",
+        # identity encoding keeps GZipMiddleware from buffering the stream
+        headers={"Content-Encoding": "identity", "X-Accel-Buffering": "no"},
+    )
+
 @app.get("/current_object")
 async def current_object():
     """Get the current object being processed."""
-    global processing_complete, last_processed_object
+    global _review_state
+    state = _review_state
 
     # If processing is complete and we have a last object, return it
-    if processing_complete and last_processed_object:
+    if state.complete and state.last_obj:
         logger.debug("Processing complete, returning last processed object")
-        response_obj = dict(last_processed_object)
+        response_obj = dict(state.last_obj)
         response_obj["manual_analysis_required"] = False
         response_obj["awaiting_user_decision"] = False
         response_obj["show_auto_analysis"] = False
         response_obj["decision_stage"] = None
         return response_obj
 
-    obj = get_current_object()
+    obj = get_current_view()
 
     if obj:
-        # Create a copy to avoid modifying the original
-        response_obj = dict(obj)
-        response_obj['current_filename'] = get_current_filename()
-        decision_context = get_decision_context()
-        response_obj["decision_stage"] = decision_context.get("decision_stage")
-        response_obj["show_auto_analysis"] = decision_context.get("show_auto_analysis", False)
-        response_obj["awaiting_user_decision"] = decision_context.get("awaiting_user_decision", False)
-        response_obj["manual_analysis_required"] = response_obj["decision_stage"] == 2
-
         # Store this as the last processed object
-        last_processed_object = response_obj
+        if obj is not state.last_obj:
+            _review_state = replace(state, last_obj=obj)
 
-        return response_obj
+        # The view is shared across polls; serialize it directly instead of copying it
+        return ORJSONResponse(obj)
     else:
         return None
 
@@ -200,25 +415,14 @@ async def current_object():
 async def submit_decision(decision: Decision):
     """Submit a decision for the current object."""
     try:
-        logger.info(f"Received decision: {decision.decision}")
-        # Convert the decision to the correct type
-        if isinstance(decision.decision, str):
-            if decision.decision.lower() == 'true':
-                decision_value = True
-            elif decision.decision.lower() == 'false':
-                decision_value = False
-            else:
-                decision_value = int(decision.decision)
-        else:
-            decision_value = decision.decision
-
-        logger.info(f"Converted decision value: {decision_value}")
-        set_user_decision(decision_value)
+        # The model has already converted string decisions
+        logger.info("Received decision: %s", decision.decision)
+        set_user_decision(decision.decision)
         logger.info("Decision set successfully")
         return {"status": "Decision received"}
     except Exception as e:
         logger.error(f"Error submitting decision: {str(e)}")
-        return JSONResponse(content={"error": str(e)}, status_code=500)
+        return ORJSONResponse(content={"error": str(e)}, status_code=500)
 
 @app.get("/processed_status")
 async def processed_status():
@@ -228,10 +432,15 @@ async def processed_status():
     Returns:
         list: List of dictionaries with {'filename': 'filename.json'} format.
     """
+    global _processed_status_cache
     try:
         # Get the processed files status using the function from json_processor.py
         status = get_processed_status()
 
+        # Unchanged list: send the body serialized last time
+        if _processed_status_cache is not None and _processed_status_cache[0] is status:
+            return Response(content=_processed_status_cache[1], media_type="application/json")
+
         # The get_processed_status function should always return a list, but let's double-check
         if not isinstance(status, list):
             logger.warning(f"Invalid status format returned: {status}, converting to empty list")
@@ -246,8 +455,10 @@ async def processed_status():
             else:
                 logger.warning(f"Invalid item in status: {item}, skipping")
 
-        # Return the cleaned status list
-        return cleaned_status
+        # Return the cleaned status list, keeping its serialized form for the next poll
+        body = orjson.dumps(cleaned_status)
+        _processed_status_cache = (status, body)
+        return Response(content=body, media_type="application/json")
     except Exception as e:
         # If anything goes wrong, log it and return an empty list
         logger.error(f"Error in processed_status endpoint: {str(e)}")
@@ -262,12 +473,17 @@ async def clear_cache():
         dict: A dictionary with the new cache buster value.
     """
     global CACHE_BUSTER
+    # Drop the rendered index page so it is rebuilt with the new value
+    _index_cache.clear()
     # Generate a new cache buster timestamp
-    CACHE_BUSTER = str(int(time.time()))
+    CACHE_BUSTER = str(time.time_ns())
     # Update the UI manager's cache buster
     ui_manager.update_cache_buster()
     return {"cache_buster": CACHE_BUSTER, "status": "Cache cleared"}
 
+# Frontend reports are logged as app.frontend so they can be told apart from server errors
+_frontend_logger = logger.getChild("frontend")
+
 @app.post("/log_frontend_error")
 async def log_frontend_error(error_log: ErrorLog):
     """
@@ -280,21 +496,24 @@ async def log_frontend_error(error_log: ErrorLog):
         dict: Status of the logging operation.
     """
     try:
-        # Format the error message
-        error_message = f"{error_log.source}: {error_log.message}"
+        # Formatting is left to the log listener thread; the fields also travel as record attributes
+        fields = {"source": error_log.source, "stack": error_log.stack}
         if error_log.stack:
-            error_message += f"\nStack: {error_log.stack}"
-
-        # Log the error
-        logger.error(f"Frontend error: {error_message}")
+            _frontend_logger.error("Frontend error: %s: %s\nStack: %s",
+                                   error_log.source, error_log.message, error_log.stack, extra=fields)
+        else:
+            _frontend_logger.error("Frontend error: %s: %s", error_log.source, error_log.message, extra=fields)
 
         return {"status": "Error logged successfully"}
     except Exception as e:
         logger.error(f"Error logging frontend error: {str(e)}")
-        return JSONResponse(content={"error": "Failed to log error"}, status_code=500)
+        return ORJSONResponse(content={"error": "Failed to log error"}, status_code=500)
 
 if __name__ == '__main__':
     try:
+        # uvicorn's default loop="auto" and http="auto" already pick uvloop and httptools
+        # (see requirements.txt) when they import, and fall back to asyncio and h11 otherwise,
+        # e.g. uvloop on Windows, so the calls below need no explicit loop or http argument
         import uvicorn
         import os
 
@@ -318,7 +537,9 @@ if __name__ == '__main__':
                     host=host,
                     port=port,
                     ssl_keyfile=ssl_keyfile,
-                    ssl_certfile=ssl_certfile
+                    ssl_certfile=ssl_certfile,
+                    # Forward-secret AEAD suites only; AES-GCM runs on AES-NI where the CPU has it
+                    ssl_ciphers="ECDHE+AESGCM:ECDHE+CHACHA20"
                 )
             except Exception as e:
                 logger.error(f"Error starting HTTPS server: {str(e)}")
@@ -2,12 +2,18 @@
 UI manager for the LLM Vulnerability Function Localization Web Processing.
 """
 
+import logging
 import threading
 import time
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, List
 
 from .logging_manager import logger
 
+# update_progress publishes at most once per this many seconds, unless a value
+# moved by more than _PROGRESS_MIN_DELTA percentage points or the update is forced
+_PROGRESS_MIN_INTERVAL = 0.1
+_PROGRESS_MIN_DELTA = 0.5
+
 
 class Progress:
     """
@@ -18,15 +24,28 @@ class Progress:
         """
         Initialize the progress tracker.
         """
-        self.file_progress = 0
-        self.total_progress = 0
-        self.current_file_index = 0
-        self.total_files = 0
-        self.current_object_index = 0
-        self.total_objects = 0
-        self.total_objects_processed = 0
-        self.total_objects_all_files = 0
-        self.lock = threading.Lock()
+        # Published progress; update replaces the whole dict, so get needs no lock
+        self._snapshot: Dict[str, Any] = {
+            "file_progress": 0,
+            "total_progress": 0,
+            "current_file_index": 0,
+            "total_files": 0,
+            "current_object_index": 0,
+            "total_objects": 0,
+            "total_objects_processed": 0,
+            "total_objects_all_files": 0
+        }
+        self.lock = threading.Lock()  # Serializes writers only
+        self._listeners: List[Callable[[], None]] = []
+
+    def add_listener(self, callback: Callable[[], None]):
+        """
+        Register a callback to run after every progress update.
+
+        Args:
+            callback: Called without arguments, on whichever thread updated the progress.
+        """
+        self._listeners.append(callback)
 
     def update(self, file_progress: float, total_progress: float, 
                current_file_index: int, total_files: int,
@@ -47,19 +66,28 @@ class Progress:
             total_objects_all_files: Total number of objects across all files.
         """
         with self.lock:
-            self.file_progress = file_progress
-            self.total_progress = total_progress
-            self.current_file_index = current_file_index
-            self.total_files = total_files
-            self.current_object_index = current_object_index
-            self.total_objects = total_objects
-            if total_objects_processed is not None:
-                self.total_objects_processed = total_objects_processed
-            if total_objects_all_files is not None:
-                self.total_objects_all_files = total_objects_all_files
-                
-        # Log progress updates
-        logger.debug(f"Progress updated: {self.get()}")
+            previous = self._snapshot
+            self._snapshot = {
+                "file_progress": file_progress,
+                "total_progress": total_progress,
+                "current_file_index": current_file_index,
+                "total_files": total_files,
+                "current_object_index": current_object_index,
+                "total_objects": total_objects,
+                "total_objects_processed": (
+                    previous["total_objects_processed"] if total_objects_processed is None else total_objects_processed
+                ),
+                "total_objects_all_files": (
+                    previous["total_objects_all_files"] if total_objects_all_files is None else total_objects_all_files
+                )
+            }
+
+        for callback in self._listeners:
+            callback()
+
+        # Log progress updates; skip building the snapshot when debug logging is off
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Progress updated: %s", self.get())
 
     def get(self) -> Dict[str, Any]:
         """
@@ -68,17 +96,8 @@ class Progress:
         Returns:
             Dictionary containing the progress information.
         """
-        with self.lock:
-            return {
-                "file_progress": self.file_progress,
-                "total_progress": self.total_progress,
-                "current_file_index": self.current_file_index,
-                "total_files": self.total_files,
-                "current_object_index": self.current_object_index,
-                "total_objects": self.total_objects,
-                "total_objects_processed": self.total_objects_processed,
-                "total_objects_all_files": self.total_objects_all_files
-            }
+        # A single reference read; the copy leaves the published dict untouched by callers
+        return dict(self._snapshot)
 
 
 class UIManager:
@@ -91,22 +110,32 @@ class UIManager:
         Initialize the UI manager.
         """
         self.progress = Progress()
-        self.cache_buster = str(int(time.time()))
+        self.cache_buster = str(time.time_ns())
+        # Last values update_progress published, and when
+        self._flushed = (0, 0.0, 0.0)  # (file_index, file_progress, total_progress)
+        self._last_flush_time = 0.0
         
     def reset_progress(self):
         """
         Reset all progress values to initial state.
         """
         self.progress.update(0, 0, 0, 0, 0, 0, 0, 0)
+        self._flushed = (0, 0.0, 0.0)
+        self._last_flush_time = 0.0
         logger.info("Progress reset")
         
     def update_progress(self, file_index: int, total_files: int, 
                         obj_index: int, total_objects: int,
                         total_objects_processed: int = None, 
-                        total_objects_all_files: int = None):
+                        total_objects_all_files: int = None,
+                        force: bool = False):
         """
         Update the progress information.
 
+        Updates are coalesced: one that arrives within _PROGRESS_MIN_INTERVAL of the last
+        published update, in the same file, with neither percentage moved by more than
+        _PROGRESS_MIN_DELTA, is dropped. Completed files always publish.
+
         Args:
             file_index: Index of the current file being processed.
             total_files: Total number of files to process.
@@ -114,6 +143,8 @@ class UIManager:
             total_objects: Total number of objects in the current file.
             total_objects_processed: Total number of objects processed across all files.
             total_objects_all_files: Total number of objects across all files.
+            force: Publish even if the update would be coalesced, e.g. for an object the user
+                is about to review.
         """
         file_progress = (obj_index / total_objects) * 100 if total_objects > 0 else 0
 
@@ -124,6 +155,18 @@ class UIManager:
             # Fallback to old calculation method
             total_progress = ((file_index - 1 + (obj_index / total_objects)) / total_files) * 100 if total_files > 0 and total_objects > 0 else 0
 
+        now = time.monotonic()
+        flushed_file_index, flushed_file_progress, flushed_total_progress = self._flushed
+        if not (force
+                or file_progress >= 100
+                or file_index != flushed_file_index
+                or abs(file_progress - flushed_file_progress) > _PROGRESS_MIN_DELTA
+                or abs(total_progress - flushed_total_progress) > _PROGRESS_MIN_DELTA
+                or now - self._last_flush_time >= _PROGRESS_MIN_INTERVAL):
+            return
+        self._flushed = (file_index, file_progress, total_progress)
+        self._last_flush_time = now
+
         self.progress.update(
             file_progress,
             total_progress,
@@ -139,7 +182,7 @@ class UIManager:
         """
         Update the cache buster timestamp.
         """
-        self.cache_buster = str(int(time.time()))
+        self.cache_buster = str(time.time_ns())
         logger.debug(f"Cache buster updated: {self.cache_buster}")
         
     def get_cache_buster(self) -> str:
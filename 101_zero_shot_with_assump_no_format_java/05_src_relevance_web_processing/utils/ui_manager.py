@@ -4,7 +4,7 @@ UI Manager for the LLM Vulnerability Function Localization Web Processing System
 """
 
 import logging
-import threading
+from collections import deque
 from typing import Any, Dict, List, Optional, Tuple
 
 
@@ -14,9 +14,9 @@ class ProgressTracker:
     """
 
     def __init__(self):
-        self.file_progress = 0.0
-        self.total_progress = 0.0
-        self.lock = threading.Lock()
+        # (file_progress, total_progress), replaced as a whole so readers never
+        # see a half-updated pair; rebinding an attribute is atomic under the GIL
+        self._state: Tuple[float, float] = (0.0, 0.0)
         self.logger = logging.getLogger(__name__)
 
     def update(self, file_progress: float, total_progress: float) -> None:
@@ -27,12 +27,10 @@ class ProgressTracker:
             file_progress: Progress percentage for the current file (0-100)
             total_progress: Overall progress percentage (0-100)
         """
-        with self.lock:
-            self.file_progress = file_progress
-            self.total_progress = total_progress
-            self.logger.debug(
-                f"Progress updated - File: {file_progress:.2f}%, Total: {total_progress:.2f}%"
-            )
+        self._state = (file_progress, total_progress)
+        self.logger.debug(
+            "Progress updated - File: %.2f%%, Total: %.2f%%", file_progress, total_progress
+        )
 
     def get(self) -> Tuple[float, float]:
         """
@@ -41,8 +39,7 @@ class ProgressTracker:
         Returns:
             Tuple of (file_progress, total_progress)
         """
-        with self.lock:
-            return self.file_progress, self.total_progress
+        return self._state
 
 
 class NotificationManager:
@@ -51,8 +48,8 @@ class NotificationManager:
     """
 
     def __init__(self):
-        self.notifications = []
-        self.lock = threading.Lock()
+        # Notifications not yet delivered; deque append/popleft are thread-safe
+        self._pending: deque = deque()
         self.logger = logging.getLogger(__name__)
 
     def add_notification(self, message: str, level: str = "info") -> None:
@@ -63,24 +60,28 @@ class NotificationManager:
             message: The notification message
             level: Notification level (info, warning, error)
         """
-        with self.lock:
-            self.notifications.append(
-                {"message": message, "level": level, "read": False}
-            )
-            self.logger.debug(f"Added {level} notification: {message}")
+        self._pending.append({"message": message, "level": level, "read": False})
+        self.logger.debug("Added %s notification: %s", level, message)
 
     def get_unread_notifications(self) -> List[Dict[str, Any]]:
         """
         Get all unread notifications.
 
+        Delivered notifications are removed rather than kept and flagged.
+
         Returns:
             List of unread notification objects
         """
-        with self.lock:
-            unread = [n for n in self.notifications if not n["read"]]
-            for n in unread:
-                n["read"] = True
-            return unread
+        unread = []
+        # popleft one at a time so a notification added meanwhile is never lost
+        while True:
+            try:
+                notification = self._pending.popleft()
+            except IndexError:
+                break
+            notification["read"] = True
+            unread.append(notification)
+        return unread
 
 
 class UIManager:
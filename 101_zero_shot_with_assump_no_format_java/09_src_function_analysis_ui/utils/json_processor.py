@@ -2,17 +2,126 @@
 JSON processor for the LLM Vulnerability Function Localization Web Processing.
 """
 
-import json
+import functools
+import mmap
+import multiprocessing
 import os
+import queue
 import re
 import threading
 import time
-from typing import Dict, Any, List, Optional, Union
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+import ijson
+import orjson
 
 from .config_manager import config
 from .logging_manager import logger
 from .ui_manager import update_progress
 
+# JSON repair patterns, compiled once at import
+_TRAILING_COMMA_OBJ = re.compile(r',\s*}')
+_TRAILING_COMMA_ARR = re.compile(r',\s*\]')
+_UNQUOTED_KEY = re.compile(r'([{,])\s*(\w+)\s*:')
+# Literal "\n" and "\t" escape sequences (backslash + letter) left in LLM output
+_ESCAPED_WHITESPACE = re.compile(r'\\[nt]')
+
+# Output files are written through a large buffer and flushed only before blocking on the user
+_OUTPUT_BUFFER_SIZE = 1 << 20
+
+# Automatically labelled objects only refresh the progress bar every this many objects
+_PROGRESS_INTERVAL = 16
+
+# First characters (after whitespace) of any string the JSON parsing attempts can recover:
+# an object or array, a quoted JSON string, a single-quoted value, or a literal escape sequence
+_JSON_START_CHARS = frozenset('{["\'\\')
+
+# Queued in place of a user decision to wake a processing thread that was asked to stop
+_STOP_DECISION = object()
+
+# Distinct function_analysis strings whose parsed decision is remembered
+_ANALYSIS_CACHE_SIZE = 4096
+
+# Exact string values accepted for is_function_vulnerable
+_TRUE_TOKENS = frozenset({'true', 'yes', 'vulnerable', '1'})
+_FALSE_TOKENS = frozenset({'false', 'no', 'not vulnerable', 'not_vulnerable', '0'})
+
+
+def _encode_output_object(obj: Dict[str, Any]) -> bytes:
+    """
+    Encode an object as an element of the pretty-printed output array.
+
+    Unlike json.dumps, non-ASCII text is written as UTF-8 rather than \\uXXXX escapes.
+    orjson would write NaN and Infinity as null, but the input parser rejects
+    them, so they never reach the output.
+
+    Args:
+        obj: The processed object.
+
+    Returns:
+        The object as indented JSON, nested one level inside the array.
+    """
+    # JSON strings never hold raw newlines, so every newline is a line break of the layout
+    return b'  ' + orjson.dumps(obj, option=orjson.OPT_INDENT_2).replace(b'\n', b'\n  ')
+
+
+def _scan_input_file(input_path: str) -> Tuple[int, bool]:
+    """
+    Count the objects in an input file and check whether any of them needs review.
+
+    Runs in a worker process, so it uses no processor state and does no logging.
+    The file is streamed through a mapping, which also leaves its pages cached
+    for the processing pass.
+
+    Args:
+        input_path: Path of the input JSON file.
+
+    Returns:
+        Tuple of (object count, whether any object needs review).
+    """
+    object_count = 0
+    needs_review = False
+    with open(input_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        for obj in ijson.items(mapped, 'item', use_float=True):
+            object_count += 1
+            needs_review = needs_review or obj.get('relevance_label') not in (-1, 0)
+    return object_count, needs_review
+
+
+def _process_file_auto(input_path: str, output_path: str) -> int:
+    """
+    Label a file in which no object needs review (every relevance_label is -1 or 0).
+
+    Runs in a worker process, so it uses no processor state and does no logging.
+
+    Args:
+        input_path: Path of the input JSON file.
+        output_path: Path to write the processed JSON file.
+
+    Returns:
+        The number of objects written.
+    """
+    object_count = 0
+    with open(input_path, 'rb') as in_f, \
+            open(output_path, 'wb', buffering=_OUTPUT_BUFFER_SIZE) as out_f:
+        out_f.write(b'[\n')
+        for obj in ijson.items(in_f, 'item', use_float=True):
+            obj['function_label'] = 0
+            obj.pop('function_analysis', None)
+            if object_count:
+                out_f.write(b',\n')
+            out_f.write(_encode_output_object(obj))
+            object_count += 1
+        out_f.write(b'\n]\n')
+    return object_count
+
+
+class ProcessingStopped(Exception):
+    """
+    Raised on the processing thread once a stop has been requested.
+    """
+
 
 class JSONProcessor:
     """
@@ -26,14 +135,22 @@ class JSONProcessor:
         self.current_object = None
         self.user_decision = None
         self.current_filename = None
-        self.processed_objects = []  # List to track processed objects
         self.processed_files = []    # List to track completed files
-        self.processing_paused = threading.Event()
+        self._processed_files_set = set()  # Membership index for processed_files
+        self._status_cache = []  # Last get_processed_status result
+        self._status_cache_len = -1  # len(processed_files) the cache was built for
+        self._decision_queue = queue.Queue(maxsize=1)  # Hands user decisions to the processing thread
+        self._stop_event = threading.Event()  # Set by request_stop, polled by process_json_files
         self.is_processing = False
         self.decision_stage = None
         self.auto_decision = None
         self.awaiting_user_decision = False
         self.show_auto_analysis = False
+        self._current_view = None  # Last get_current_view result
+        self._current_view_source = None  # Object the view was built from
+        self._current_view_key = None  # Context the view was built for
+        # Identical LLM responses recur across near-duplicate functions; the string itself is the key
+        self._extract_from_json_cached = functools.lru_cache(maxsize=_ANALYSIS_CACHE_SIZE)(self._extract_from_json)
 
     def reset_processing_state(self):
         """
@@ -42,13 +159,20 @@ class JSONProcessor:
         self.current_object = None
         self.user_decision = None
         self.current_filename = None
-        self.processed_objects = []
         self.processed_files = []
+        self._processed_files_set = set()
+        self._status_cache = []
+        self._status_cache_len = -1
         self.is_processing = False
         self.decision_stage = None
         self.auto_decision = None
         self.awaiting_user_decision = False
         self.show_auto_analysis = False
+        self._current_view = None
+        self._current_view_source = None
+        self._current_view_key = None
+        self._stop_event.clear()
+        self._drain_decision_queue()
         logger.info("Processing state reset")
 
     def get_current_object(self) -> Optional[Dict[str, Any]]:
@@ -60,6 +184,35 @@ class JSONProcessor:
         """
         return self.current_object
 
+    def get_current_view(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the current object merged with its filename and decision context for the UI.
+
+        The merged dictionary is rebuilt only when the object or its context changes,
+        so polling does not copy the object on every request. Callers must not modify it.
+
+        Returns:
+            The merged object or None if no object is being processed.
+        """
+        obj = self.current_object
+        if obj is None:
+            return None
+        # The source object is kept and compared by identity: once it is released,
+        # the next streamed object may be allocated at the same address
+        key = (self.current_filename, self.decision_stage,
+               self.show_auto_analysis, self.awaiting_user_decision)
+        if obj is not self._current_view_source or key != self._current_view_key:
+            view = dict(obj)
+            view['current_filename'] = self.current_filename
+            view['decision_stage'] = self.decision_stage
+            view['show_auto_analysis'] = self.show_auto_analysis
+            view['awaiting_user_decision'] = self.awaiting_user_decision
+            view['manual_analysis_required'] = self.decision_stage == 2
+            self._current_view = view
+            self._current_view_source = obj
+            self._current_view_key = key
+        return self._current_view
+
     def get_current_filename(self) -> Optional[str]:
         """
         Get the name of the file currently being processed.
@@ -76,11 +229,29 @@ class JSONProcessor:
         Args:
             decision: The user's decision (1/True for vulnerable, 0/False for not vulnerable).
         """
-        self.user_decision = decision
-        self.awaiting_user_decision = False
-        self.processing_paused.set()  # Resume processing
+        try:
+            # Resume processing; only the processing thread updates the decision state,
+            # since it may already be showing the next stage by the time this returns
+            self._decision_queue.put_nowait(decision)
+        except queue.Full:
+            logger.warning(f"A decision is already pending, ignoring: {decision}")
+            return
         logger.info(f"User decision set: {decision}")
 
+    def request_stop(self):
+        """
+        Ask process_json_files to stop after the current object.
+
+        A processing thread waiting on a user decision is woken immediately.
+        """
+        self._stop_event.set()
+        try:
+            self._decision_queue.put_nowait(_STOP_DECISION)
+        except queue.Full:
+            # A decision is already pending; the thread stops once it has applied it
+            pass
+        logger.info("Stop requested")
+
     def get_decision_context(self) -> Dict[str, Any]:
         """
         Get the current decision context for the UI.
@@ -106,6 +277,16 @@ class JSONProcessor:
         self.awaiting_user_decision = False
         self.show_auto_analysis = False
 
+    def _drain_decision_queue(self):
+        """
+        Discard any decision that was submitted while no object was awaiting one.
+        """
+        try:
+            while True:
+                self._decision_queue.get_nowait()
+        except queue.Empty:
+            pass
+
     def _await_user_decision(
         self,
         obj: Dict[str, Any],
@@ -122,22 +303,31 @@ class JSONProcessor:
 
         Returns:
             The user's decision.
+
+        Raises:
+            ProcessingStopped: If a stop is requested before a decision arrives.
         """
+        self._drain_decision_queue()
+        # A stop requested before the drain would have had its wake-up discarded
+        if self._stop_event.is_set():
+            raise ProcessingStopped()
         self.current_object = obj
         self.user_decision = None
         self.decision_stage = stage
         self.auto_decision = auto_decision
         self.show_auto_analysis = stage == 2
         self.awaiting_user_decision = True
-        self.processing_paused.clear()
 
         logger.info(
             f"Waiting for user decision (stage {stage}) on object ID: {obj.get('id', 'unknown')}"
         )
-        self.processing_paused.wait()
+        decision = self._decision_queue.get()
 
         self.awaiting_user_decision = False
-        return self.user_decision
+        if decision is _STOP_DECISION:
+            raise ProcessingStopped()
+        self.user_decision = decision
+        return decision
 
     def get_processed_status(self) -> List[Dict[str, str]]:
         """
@@ -147,25 +337,26 @@ class JSONProcessor:
             A list of dictionaries, each with a 'filename' key containing the filename (no paths).
             Always returns a valid list, even if empty.
         """
+        # processed_files is always a list: __init__ and reset_processing_state create it
         try:
+            # processed_files only ever grows, so an unchanged length means an unchanged list
+            if len(self.processed_files) == self._status_cache_len:
+                return self._status_cache
+
+            # Entries added through process_json_files are already unique bare filenames
+            if len(self.processed_files) == len(self._processed_files_set):
+                self._status_cache = [{"filename": os.path.basename(f)} for f in self.processed_files]
+                self._status_cache_len = len(self.processed_files)
+                return self._status_cache
+
             # Create a clean list of unique filenames without paths
             unique_filenames = set()
             clean_files = []
 
-            # Ensure processed_files is initialized
-            if not hasattr(self, 'processed_files') or self.processed_files is None:
-                self.processed_files = []
-                logger.warning("processed_files was not initialized, creating empty list")
-
-            # Ensure it's a list
-            if not isinstance(self.processed_files, list):
-                logger.warning(f"processed_files is not a list: {type(self.processed_files)}, creating empty list")
-                self.processed_files = []
-
             for item in self.processed_files:
                 if isinstance(item, str):
                     # Extract just the filename without the path
-                    filename = item.split('/')[-1]
+                    filename = os.path.basename(item)
                     if filename not in unique_filenames:
                         unique_filenames.add(filename)
                         clean_files.append(filename)
@@ -174,9 +365,12 @@ class JSONProcessor:
 
             # Update processed_files to the clean list
             self.processed_files = clean_files
+            self._processed_files_set = unique_filenames
 
             # Return as list of dicts with 'filename' key
             result = [{"filename": filename} for filename in self.processed_files]
+            self._status_cache = result
+            self._status_cache_len = len(self.processed_files)
 
             # Debug outputs
             logger.debug(f"Clean processed files list: {clean_files}")
@@ -189,6 +383,36 @@ class JSONProcessor:
             logger.error(f"Error in get_processed_status: {str(e)}")
             return []
 
+    def _add_processed_file(self, filename: str):
+        """
+        Record a completed file in the processed_files list.
+
+        Args:
+            filename: Name of the completed file (no path).
+        """
+        # Add the filename to the processed_files list
+        logger.debug(f"Current processed_files before adding: {self.processed_files}")
+
+        # Use just the filename (no path) to ensure consistency
+        simple_filename = filename  # Just the filename without the path
+
+        # Ensure we're only adding a string (filename) to the processed_files list
+        if not isinstance(simple_filename, str):
+            logger.warning(f"Attempted to add non-string item to processed_files: {simple_filename}, converting to string")
+            simple_filename = str(simple_filename)
+
+        # Check if the file is already in the processed_files list
+        if simple_filename not in self._processed_files_set:
+            # Add the file to the processed_files list
+            self._processed_files_set.add(simple_filename)
+            self.processed_files.append(simple_filename)
+            logger.info(f"Added {simple_filename} to processed files list")
+        else:
+            logger.debug(f"File {simple_filename} already in processed_files list")
+
+        # Log the current processed_files list at debug level only
+        logger.debug(f"Current processed_files after adding: {self.processed_files}")
+
     def process_json_files(self, input_dir: str, output_dir: str):
         """
         Process JSON files containing LLM responses.
@@ -200,146 +424,163 @@ class JSONProcessor:
         # Set processing flag to true
         self.is_processing = True
 
-        # Clear processed_objects list to ensure it's empty
-        self.processed_objects.clear()
-
         # Create output directory if it doesn't exist
         os.makedirs(output_dir, exist_ok=True)
 
-        json_files = sorted([f for f in os.listdir(input_dir) if f.endswith('.json')])
+        # Visit files in inode order, which tracks on-disk layout far better than name order
+        with os.scandir(input_dir) as it:
+            entries = [entry for entry in it if entry.name.endswith('.json')]
+        entries.sort(key=lambda entry: entry.inode())
+        json_files = [entry.name for entry in entries]
         total_files = len(json_files)
         logger.info(f"Found {total_files} JSON files to process")
 
-        # Count total objects across all files
+        objects_per_file = {}
+        auto_files = []
+        review_files = []
         total_objects_all_files = 0
-        objects_per_file = []
-        for filename in json_files:
-            input_path = os.path.join(input_dir, filename)
-            with open(input_path, 'r') as f:
-                data = json.load(f)
-            objects_per_file.append(len(data))
-            total_objects_all_files += len(data)
-
-        logger.info(f"Total objects across all files: {total_objects_all_files}")
 
         # Track processed objects count
         processed_objects_count = 0
 
-        for file_index, filename in enumerate(json_files, 1):
+        # All parsing that needs no user input runs in worker processes, so it does
+        # not compete with the server's event loop for the GIL. They are spawned
+        # rather than forked: this thread runs next to the server's threads, and a
+        # fork would copy any lock one of them holds at that moment.
+        if json_files:
+            with ProcessPoolExecutor(
+                max_workers=min(total_files, os.cpu_count() or 1),
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as executor:
+                # Count objects and find the files that need no review
+                scans = executor.map(
+                    _scan_input_file,
+                    [os.path.join(input_dir, filename) for filename in json_files],
+                    chunksize=4,
+                )
+                for filename, (object_count, needs_review) in zip(json_files, scans):
+                    objects_per_file[filename] = object_count
+                    (review_files if needs_review else auto_files).append(filename)
+                total_objects_all_files = sum(objects_per_file.values())
+
+                logger.info(f"Total objects across all files: {total_objects_all_files}")
+
+                # Files that need no review are labelled first, in parallel, so that progress
+                # only reaches the last file once the interactive files are done
+                if auto_files:
+                    logger.info(f"Labelling {len(auto_files)} files that need no review in parallel")
+                    written = executor.map(
+                        _process_file_auto,
+                        [os.path.join(input_dir, filename) for filename in auto_files],
+                        [os.path.join(output_dir, filename) for filename in auto_files],
+                        chunksize=4,
+                    )
+                    for file_index, (filename, file_objects) in enumerate(zip(auto_files, written), 1):
+                        processed_objects_count += file_objects
+                        update_progress(file_index, total_files, file_objects, file_objects, processed_objects_count, total_objects_all_files)
+                        self._add_processed_file(filename)
+                        logger.info(f"Completed processing file {filename}")
+
+        for file_index, filename in enumerate(review_files, len(auto_files) + 1):
             self.current_filename = filename
             input_path = os.path.join(input_dir, filename)
             output_path = os.path.join(output_dir, filename)
 
             logger.info(f"Processing file {file_index}/{total_files}: {filename}")
 
-            with open(input_path, 'r') as f:
-                data = json.load(f)
-
-            file_objects = len(data)
+            file_objects = objects_per_file[filename]
             logger.info(f"File contains {file_objects} objects")
+            stopped = False
 
-            with open(output_path, 'w') as out_f:
-                out_f.write('[\n')
-                for obj_index, obj in enumerate(data, 1):
-                    # Update progress
-                    update_progress(
-                        file_index,
-                        total_files,
-                        obj_index,
-                        file_objects,
-                        processed_objects_count,
-                        total_objects_all_files,
-                    )
-
-                    # Process function decisions based on relevance_label
-                    relevance_label = obj.get('relevance_label')
-                    if relevance_label in (-1, 0):
-                        # If not relevant or not vulnerable, set function_label to 0
-                        obj['function_label'] = 0
-                    else:
-                        function_analysis = obj.get('function_analysis')
-                        auto_decision = (
-                            self.extract_function_vulnerability(function_analysis)
-                            if function_analysis
-                            else None
-                        )
-                        first_decision = self._await_user_decision(obj, auto_decision, stage=1)
-
-                        if auto_decision is not None and first_decision == auto_decision:
-                            obj['function_label'] = first_decision
-                            logger.info(
-                                f"Consensus reached (stage 1) for object ID: {obj.get('id', 'unknown')}"
+            # Objects are parsed one at a time from the input stream
+            with open(input_path, 'rb') as in_f, \
+                    open(output_path, 'wb', buffering=_OUTPUT_BUFFER_SIZE) as out_f:
+                out_f.write(b'[\n')
+                objects = ijson.items(in_f, 'item', use_float=True)
+                try:
+                    for obj_index, obj in enumerate(objects, 1):
+                        if self._stop_event.is_set():
+                            raise ProcessingStopped()
+
+                        relevance_label = obj.get('relevance_label')
+                        needs_review = relevance_label not in (-1, 0)
+
+                        # Update progress; always for objects the user is about to review
+                        if needs_review or obj_index % _PROGRESS_INTERVAL == 0 or obj_index == file_objects:
+                            update_progress(
+                                file_index,
+                                total_files,
+                                obj_index,
+                                file_objects,
+                                processed_objects_count,
+                                total_objects_all_files,
+                                force=needs_review,
                             )
+
+                        # Process function decisions based on relevance_label
+                        if not needs_review:
+                            # If not relevant or not vulnerable, set function_label to 0
+                            obj['function_label'] = 0
                         else:
-                            if auto_decision is None:
+                            function_analysis = obj.get('function_analysis')
+                            auto_decision = (
+                                self.extract_function_vulnerability(function_analysis)
+                                if function_analysis
+                                else None
+                            )
+                            # Persist everything decided so far before waiting on the reviewer
+                            out_f.flush()
+                            first_decision = self._await_user_decision(obj, auto_decision, stage=1)
+
+                            if auto_decision is not None and first_decision == auto_decision:
+                                obj['function_label'] = first_decision
                                 logger.info(
-                                    "Automatic analysis could not be parsed; requesting second review for "
-                                    f"object ID: {obj.get('id', 'unknown')}"
+                                    f"Consensus reached (stage 1) for object ID: {obj.get('id', 'unknown')}"
                                 )
                             else:
+                                if auto_decision is None:
+                                    logger.info(
+                                        "Automatic analysis could not be parsed; requesting second review for "
+                                        f"object ID: {obj.get('id', 'unknown')}"
+                                    )
+                                else:
+                                    logger.info(
+                                        "Automatic analysis disagrees with user decision; requesting second review for "
+                                        f"object ID: {obj.get('id', 'unknown')}"
+                                    )
+
+                                second_decision = self._await_user_decision(obj, auto_decision, stage=2)
+                                obj['function_label'] = second_decision
                                 logger.info(
-                                    "Automatic analysis disagrees with user decision; requesting second review for "
-                                    f"object ID: {obj.get('id', 'unknown')}"
+                                    f"Applied final user decision: {second_decision} to object ID: {obj.get('id', 'unknown')}"
                                 )
 
-                            second_decision = self._await_user_decision(obj, auto_decision, stage=2)
-                            obj['function_label'] = second_decision
-                            logger.info(
-                                f"Applied final user decision: {second_decision} to object ID: {obj.get('id', 'unknown')}"
-                            )
-
-                        self._clear_decision_context()
-
-                    # Add to processed objects
-                    self.processed_objects.append(obj)
-                    processed_objects_count += 1
-
-                    # Write the processed object immediately
-                    output_obj = dict(obj)
-                    output_obj.pop('function_analysis', None)
-                    if obj_index > 1:
-                        out_f.write(',\n')
-                    json_blob = json.dumps(output_obj, indent=2)
-                    indented_blob = '\n'.join(f"  {line}" for line in json_blob.splitlines())
-                    out_f.write(indented_blob)
-                    out_f.flush()
-
-                    # Update progress with total objects across all files
-                    update_progress(
-                        file_index,
-                        total_files,
-                        obj_index,
-                        file_objects,
-                        processed_objects_count,
-                        total_objects_all_files,
-                    )
-
-                out_f.write('\n]\n')
-
-            # Update progress to show 100% completion for the current file
-            update_progress(file_index, total_files, file_objects, file_objects, processed_objects_count, total_objects_all_files)
+                            self._clear_decision_context()
 
-            # Add the filename to the processed_files list
-            logger.debug(f"Current processed_files before adding: {self.processed_files}")
+                        # The analysis text is not part of the output and is not needed once decided
+                        obj.pop('function_analysis', None)
 
-            # Use just the filename (no path) to ensure consistency
-            simple_filename = filename  # Just the filename without the path
+                        # Objects are only counted; they are not retained once written
+                        processed_objects_count += 1
 
-            # Ensure we're only adding a string (filename) to the processed_files list
-            if not isinstance(simple_filename, str):
-                logger.warning(f"Attempted to add non-string item to processed_files: {simple_filename}, converting to string")
-                simple_filename = str(simple_filename)
+                        # Write the processed object immediately
+                        if obj_index > 1:
+                            out_f.write(b',\n')
+                        out_f.write(_encode_output_object(obj))
+                except ProcessingStopped:
+                    # Close the array so the objects written so far remain a valid file
+                    stopped = True
+                out_f.write(b'\n]\n')
 
-            # Check if the file is already in the processed_files list
-            if simple_filename not in self.processed_files:
-                # Add the file to the processed_files list
-                self.processed_files.append(simple_filename)
-                logger.info(f"Added {simple_filename} to processed files list")
-            else:
-                logger.debug(f"File {simple_filename} already in processed_files list")
+            if stopped:
+                self._clear_decision_context()
+                self.is_processing = False
+                logger.info(f"Processing stopped in file {filename}; it was not marked as processed")
+                return
 
-            # Log the current processed_files list at debug level only
-            logger.debug(f"Current processed_files after adding: {self.processed_files}")
+            # Update progress to show 100% completion for the current file
+            update_progress(file_index, total_files, file_objects, file_objects, processed_objects_count, total_objects_all_files)
+            self._add_processed_file(filename)
             logger.info(f"Completed processing file {filename}")
 
         # Make sure progress shows 100% when completed
@@ -366,6 +607,8 @@ class JSONProcessor:
             return None
 
         # Only use JSON parsing for automatic vulnerability detection
+        if isinstance(function_analysis_text, str):
+            return self._extract_from_json_cached(function_analysis_text)
         return self._extract_from_json(function_analysis_text)
 
     def _extract_from_json(self, function_analysis_text: Union[str, Dict[str, Any]]) -> Optional[int]:
@@ -391,10 +634,10 @@ class JSONProcessor:
 
                     # Handle string values
                     if isinstance(value, str):
-                        value_lower = value.lower()
-                        if value_lower == 'true' or value_lower == 'yes' or value_lower == 'vulnerable':
+                        value_lower = value.strip().lower()
+                        if value_lower in _TRUE_TOKENS:
                             return 1  # Return 1 for vulnerable
-                        elif (value_lower == 'false' or value_lower == 'no' or
+                        elif (value_lower in _FALSE_TOKENS or
                               'not vulnerable' in value_lower or 'not_vulnerable' in value_lower):
                             return 0  # Return 0 for not vulnerable
 
@@ -409,12 +652,18 @@ class JSONProcessor:
 
         # If it's a string, try to parse as JSON
         elif isinstance(function_analysis_text, str):
+            # Prose or bare JSON scalars can never yield a decision; skip the failing parse attempts
+            stripped_text = function_analysis_text.lstrip()
+            if not stripped_text or stripped_text[0] not in _JSON_START_CHARS:
+                logger.warning(f"JSON parsing failed for: {function_analysis_text[:100]}..., requiring manual analysis")
+                return None
+
             try:
                 # First try direct JSON parsing
                 try:
-                    analysis_data = json.loads(function_analysis_text)
+                    analysis_data = orjson.loads(function_analysis_text)
                     return self._extract_from_json(analysis_data)
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     # If direct parsing fails, try with fixes
                     pass
 
@@ -422,19 +671,19 @@ class JSONProcessor:
                 fixed_text = self._fix_json_formatting(function_analysis_text)
 
                 # Try to parse the fixed JSON
-                analysis_data = json.loads(fixed_text)
+                analysis_data = orjson.loads(fixed_text)
 
                 # Recursively call with the parsed dictionary
                 return self._extract_from_json(analysis_data)
-            except json.JSONDecodeError as e:
+            except orjson.JSONDecodeError as e:
                 # If JSON parsing fails, try one more approach with escaped characters
                 try:
                     # Handle escaped newlines and other special characters
                     # This is specifically for cases like: "{\n  \"is_function_vulnerable\": \"not vulnerable\",\n  ...}"
-                    cleaned_text = function_analysis_text.replace('\\n', ' ').replace('\\t', ' ')
-                    analysis_data = json.loads(cleaned_text)
+                    cleaned_text = _ESCAPED_WHITESPACE.sub(' ', function_analysis_text)
+                    analysis_data = orjson.loads(cleaned_text)
                     return self._extract_from_json(analysis_data)
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     # If all JSON parsing attempts fail, require manual analysis
                     logger.warning(f"JSON parsing failed for: {function_analysis_text[:100]}..., requiring manual analysis")
             except Exception as e:
@@ -458,14 +707,14 @@ class JSONProcessor:
         fixed_text = json_text.replace("'", '"')
 
         # Fix trailing commas in objects and arrays
-        fixed_text = re.sub(r',\s*}', '}', fixed_text)
-        fixed_text = re.sub(r',\s*\]', ']', fixed_text)
+        fixed_text = _TRAILING_COMMA_OBJ.sub('}', fixed_text)
+        fixed_text = _TRAILING_COMMA_ARR.sub(']', fixed_text)
 
         # Fix missing quotes around keys
-        fixed_text = re.sub(r'([{,])\s*(\w+)\s*:', r'\1"\2":', fixed_text)
+        fixed_text = _UNQUOTED_KEY.sub(r'\1"\2":', fixed_text)
 
         # Handle escaped newlines and other special characters
-        fixed_text = fixed_text.replace('\\n', ' ').replace('\\t', ' ')
+        fixed_text = _ESCAPED_WHITESPACE.sub(' ', fixed_text)
 
         return fixed_text
 
@@ -476,8 +725,10 @@ json_processor = JSONProcessor()
 # Create aliases for commonly used methods
 process_json_files = json_processor.process_json_files
 get_current_object = json_processor.get_current_object
+get_current_view = json_processor.get_current_view
 set_user_decision = json_processor.set_user_decision
 get_current_filename = json_processor.get_current_filename
 get_processed_status = json_processor.get_processed_status
 reset_processing_state = json_processor.reset_processing_state
+request_stop = json_processor.request_stop
 get_decision_context = json_processor.get_decision_context
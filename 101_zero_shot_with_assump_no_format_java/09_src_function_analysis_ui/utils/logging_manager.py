@@ -4,12 +4,18 @@ Logging manager for the LLM Vulnerability Function Localization Web Processing.
 
 import os
 import sys
+import queue
 import logging
-from logging.handlers import RotatingFileHandler
-from typing import Optional
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict
 
 from .config_manager import config
 
+# Holds the PID of the process that writes the log files. Worker processes are
+# spawned, import this module again and inherit the variable, so they leave the
+# files and the listener to that process.
+_LOG_OWNER_ENV = 'FUNCTION_ANALYSIS_UI_LOG_OWNER'
+
 
 class ElementNotFoundFilter(logging.Filter):
     """
@@ -21,6 +27,58 @@ class ElementNotFoundFilter(logging.Filter):
         return True
 
 
+class DeferredFormatQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves all formatting to the listener thread.
+
+    The stock prepare() formats every record on the calling thread, and the
+    listener's handlers then format it again. The queue never leaves the
+    process, so the record can be queued as it is. Its arguments are only
+    turned into text later, so they should not be changed after logging.
+    """
+    def prepare(self, record):
+        return record
+
+
+class LevelRoutingFileHandler(logging.Handler):
+    """
+    Handler that formats each record once and writes it to every log file
+    whose minimum level the record meets.
+    """
+    def __init__(self, routes: Dict[str, int]):
+        """
+        Initialize the handler.
+
+        Args:
+            routes: Mapping of log file path to the minimum level written to it.
+        """
+        super().__init__(min(routes.values()))
+        self.streams = [
+            (level, open(path, 'a', encoding='utf-8'))
+            for path, level in routes.items()
+        ]
+
+    def emit(self, record):
+        try:
+            msg = self.format(record) + '\n'
+            for level, stream in self.streams:
+                if record.levelno >= level:
+                    stream.write(msg)
+                    stream.flush()
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        self.acquire()
+        try:
+            for _, stream in self.streams:
+                stream.close()
+            self.streams = []
+        finally:
+            self.release()
+        super().close()
+
+
 class LoggingManager:
     """
     Logging manager for the application.
@@ -34,9 +92,16 @@ class LoggingManager:
         self.logs_dir = config.get_logs_dir()
         self.level = self._get_log_level(config.get_logging_level())
         self.format = config.get_logging_format()
+        self._formatter = logging.Formatter(self.format)
         self.file_rotation = config.get('logging.file_rotation', True)
         self.max_bytes = config.get('logging.max_bytes', 10485760)  # 10MB
         self.backup_count = config.get('logging.backup_count', 5)
+        self._listener = None
+
+        # Worker processes must not clear the log files the server is writing
+        owner = os.environ.setdefault(_LOG_OWNER_ENV, str(os.getpid()))
+        if owner != str(os.getpid()):
+            return
 
         # Create logs directory if it doesn't exist
         os.makedirs(self.logs_dir, exist_ok=True)
@@ -71,60 +136,84 @@ class LoggingManager:
         """
         Clear all log files in the logs directory.
         """
-        for log_file in ['server.log', 'errors.log', 'frontend_errors.log']:
+        for log_file in ('server.log', 'errors.log', 'frontend_errors.log'):
             log_path = os.path.join(self.logs_dir, log_file)
-            if os.path.exists(log_path):
-                with open(log_path, 'w') as f:
-                    f.write('')
+            try:
+                os.truncate(log_path, 0)
+            except FileNotFoundError:
+                pass
         print("Log files cleared on startup")
 
     def _setup_logging(self):
         """
         Set up logging with the configured settings.
+
+        Records are only put on an in-memory queue by the caller; a background
+        QueueListener thread filters and formats them and writes them to the
+        real handlers.
         """
+        # Stop a previous listener so its handlers are flushed before replacing them
+        self.shutdown()
+
         # Clear any existing handlers
         root_logger = logging.getLogger()
         for handler in root_logger.handlers[:]:
             root_logger.removeHandler(handler)
 
-        # Set up basic configuration
-        logging.basicConfig(
-            level=self.level,
-            format=self.format,
-            handlers=[
-                logging.StreamHandler(sys.stdout)
-            ]
-        )
-
-        # Add filter to suppress repetitive messages
-        root_logger.addFilter(ElementNotFoundFilter())
-
-        # Add file handlers
-        self._add_file_handler('server.log')
-        self._add_file_handler('errors.log', logging.ERROR)
-        self._add_file_handler('frontend_errors.log', logging.ERROR)
-
-    def _add_file_handler(self, filename: str, level: Optional[int] = None):
+        root_logger.setLevel(self.level)
+
+        # Console handler
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(self._formatter)
+
+        # File handler
+        handlers = [
+            console_handler,
+            self._make_file_handler({
+                'server.log': self.level,
+                'errors.log': logging.ERROR,
+                'frontend_errors.log': logging.ERROR,
+            }),
+        ]
+
+        # Add filter to suppress repetitive messages. It builds each record's message,
+        # so it runs on the handlers in the listener thread rather than on the
+        # queue handler; a root logger filter would skip propagated records
+        message_filter = ElementNotFoundFilter()
+        for handler in handlers:
+            handler.addFilter(message_filter)
+
+        log_queue = queue.SimpleQueue()
+        root_logger.addHandler(DeferredFormatQueueHandler(log_queue))
+        self._listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        self._listener.start()
+
+    def _make_file_handler(self, levels: Dict[str, int]) -> logging.Handler:
         """
-        Add a file handler to the root logger.
+        Create the file handler for the queue listener.
 
         Args:
-            filename: The name of the log file.
-            level: The log level for this handler. If None, uses the default level.
-        """
-        if level is None:
-            level = self.level
-
-        log_path = os.path.join(self.logs_dir, filename)
+            levels: Mapping of log file name to the minimum level written to it.
 
+        Returns:
+            The configured file handler.
+        """
         # Always use non-rotating file handlers and clear files on startup
-        handler = logging.FileHandler(log_path)
+        handler = LevelRoutingFileHandler({
+            os.path.join(self.logs_dir, filename): level
+            for filename, level in levels.items()
+        })
 
-        handler.setLevel(level)
-        formatter = logging.Formatter(self.format)
-        handler.setFormatter(formatter)
-        handler.addFilter(ElementNotFoundFilter())
-        logging.getLogger().addHandler(handler)
+        handler.setFormatter(self._formatter)
+        return handler
+
+    def shutdown(self):
+        """
+        Stop the queue listener, flushing any records still waiting to be written.
+        """
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
 
     def get_logger(self, name: str) -> logging.Logger:
         """
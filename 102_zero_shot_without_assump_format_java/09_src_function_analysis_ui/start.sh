@@ -51,9 +51,24 @@ build_tailwind_css() {
     echo "Tailwind CSS build complete!"
 }
 
+# Function to precompress static assets, served in place of the originals when the browser accepts them
+precompress_static_assets() {
+    echo "Precompressing static assets..."
+    find ./static -type f \( -name '*.css' -o -name '*.js' -o -name '*.svg' -o -name '*.html' \) -not -path './static/src/*' |
+    while read -r asset; do
+        gzip -9 -k -f "$asset"
+        if command -v brotli &> /dev/null; then
+            brotli -q 11 -k -f "$asset"
+        fi
+    done
+}
+
 # Build Tailwind CSS
 build_tailwind_css
 
+# Precompress static assets
+precompress_static_assets
+
 # Generate SSL certificates
 echo "Setting up SSL certificates..."
 
@@ -2,10 +2,32 @@
 Configuration manager for the LLM Vulnerability Function Localization Web Processing.
 """
 
+import functools
 import os
 import yaml
 from typing import Dict, Any, Optional
 
+# Prefer the libyaml-backed loader and fall back to the pure-Python one
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+
+@functools.lru_cache(maxsize=1)
+def _read_config_file(config_path: str) -> Dict[str, Any]:
+    """
+    Parse a YAML configuration file, caching the result per path.
+
+    Args:
+        config_path: Path to the configuration file.
+
+    Returns:
+        Dict containing the parsed configuration values.
+    """
+    with open(config_path, 'r') as f:
+        return yaml.load(f, Loader=_Loader)
+
 
 class ConfigManager:
     """
@@ -22,6 +44,7 @@ class ConfigManager:
         """
         self.config_path = config_path
         self.config = self._load_config()
+        self._flat = self._flatten(self.config)
 
     def _load_config(self) -> Dict[str, Any]:
         """
@@ -31,9 +54,7 @@ class ConfigManager:
             Dict containing the configuration values.
         """
         try:
-            with open(self.config_path, 'r') as f:
-                config = yaml.safe_load(f)
-            return config
+            return _read_config_file(self.config_path)
         except Exception as e:
             print(f"Error loading configuration: {e}")
             # Return default configuration
@@ -61,6 +82,28 @@ class ConfigManager:
                 }
             }
 
+    def _flatten(self, config: Dict[str, Any], prefix: str = '') -> Dict[str, Any]:
+        """
+        Flatten the nested configuration into dot-notation keys.
+
+        Args:
+            config: The (nested) configuration dictionary.
+            prefix: The dot-notation prefix of the current level.
+
+        Returns:
+            Dict mapping every dot-notation key, including sections, to its value.
+        """
+        flat = {}
+        if not isinstance(config, dict):
+            return flat
+
+        for k, value in config.items():
+            key = f"{prefix}{k}"
+            flat[key] = value
+            if isinstance(value, dict):
+                flat.update(self._flatten(value, f"{key}."))
+        return flat
+
     def get(self, key: str, default: Any = None) -> Any:
         """
         Get a configuration value.
@@ -72,16 +115,7 @@ class ConfigManager:
         Returns:
             The configuration value or the default value if not found.
         """
-        keys = key.split('.')
-        value = self.config
-        
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                return default
-                
-        return value
+        return self._flat.get(key, default)
 
     def get_input_dir(self) -> str:
         """
@@ -3,21 +3,29 @@ Main application for the LLM Vulnerability Function Localization Web Processing
 
 """
 
+import asyncio
 import logging
 import os
-import threading
+import re
 import time
-from typing import Callable, Union
+from typing import AsyncIterator, Optional, Set, Tuple, Union
 
+import orjson
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import FileResponse, HTMLResponse, JSONResponse
+from fastapi.responses import (
+    HTMLResponse,
+    JSONResponse,
+    ORJSONResponse,
+    RedirectResponse,
+    StreamingResponse,
+)
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 # Import utility modules
 from utils.config_manager import config
@@ -34,7 +42,11 @@ VERSION = config.get_version()
 logger.info(f"Application starting with version identifier: {VERSION}")
 
 # Create FastAPI application
-app = FastAPI(title="LLM Vulnerability Function Localization System")
+# Serialize responses with orjson rather than the stdlib json encoder
+app = FastAPI(
+    title="LLM Vulnerability Function Localization System",
+    default_response_class=ORJSONResponse,
+)
 
 # Add CORS middleware
 app.add_middleware(
@@ -45,35 +57,63 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Add GZip compression
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# Precomputed raw cache control headers, appended as-is to each response
+# For static files, use cache with version parameter for cache busting (1 year)
+_STATIC_HDRS = [(b"cache-control", b"public, max-age=31536000, immutable")]
+# For polled state, let the browser keep a copy but always revalidate
+_REVALIDATE_HDRS = [(b"cache-control", b"no-cache, must-revalidate, max-age=0")]
+# For API responses and HTML, no caching
+_NOCACHE_HDRS = [
+    (b"cache-control", b"no-store, no-cache, must-revalidate, max-age=0"),
+    (b"pragma", b"no-cache"),
+    (b"expires", b"0"),
+]
 
 
 # Cache control middleware
-class CacheControlMiddleware(BaseHTTPMiddleware):
-    """Middleware to add cache control headers to responses."""
+class CacheControlMiddleware:
+    """Pure ASGI middleware to add cache control headers to responses."""
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        response = await call_next(request)
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
 
-        # Add cache control headers
-        if request.url.path.startswith("/static"):
-            # For static files, use cache with version parameter for cache busting
-            response.headers["Cache-Control"] = "public, max-age=31536000"  # 1 year
-        else:
-            # For API responses and HTML, no caching
-            response.headers["Cache-Control"] = (
-                "no-store, no-cache, must-revalidate, max-age=0"
-            )
-            response.headers["Pragma"] = "no-cache"
-            response.headers["Expires"] = "0"
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        is_static = scope["path"].startswith("/static")
+
+        async def send_with_cache_headers(message: Message) -> None:
+            # Add cache control headers once the response headers are known
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                if is_static:
+                    headers.extend(_STATIC_HDRS)
+                elif message["status"] == 304 or any(
+                    name == b"etag" for name, _ in headers
+                ):
+                    headers.extend(_REVALIDATE_HDRS)
+                else:
+                    headers.extend(_NOCACHE_HDRS)
+                message["headers"] = headers
+            await send(message)
 
-        return response
+        await self.app(scope, receive, send_with_cache_headers)
 
 
 # Add cache control middleware
 app.add_middleware(CacheControlMiddleware)
 
+# Add GZip compression. Registered last so it is the outermost middleware.
+# Small poll bodies (/progress is ~80 bytes) fit in one packet and stay
+# uncompressed, so in practice only /current_object and assets get gzipped.
+app.add_middleware(GZipMiddleware, minimum_size=1500, compresslevel=6)
+
+
+# Minimum interval between access log lines for the same polling endpoint
+_ACCESS_LOG_INTERVAL_NS = 10 * 1_000_000_000
+
 
 # Configure logging to reduce access log noise
 # This will filter out the frequent polling requests
@@ -83,7 +123,21 @@ class AccessLogFilter(logging.Filter):
     def __init__(self):
         super().__init__()
         self.polling_endpoints = {"/current_object", "/progress", "/processing_status"}
-        self.last_logged = {}
+        self._poll_re = re.compile(r"(?:/current_object|/progress|/processing_status)\b")
+        # None means never logged; monotonic time has no fixed zero point
+        self.last_logged = dict.fromkeys(self.polling_endpoints)
+
+    def _polling_endpoint(self, record) -> Optional[str]:
+        """Return the polling endpoint a record refers to, if any."""
+        # uvicorn passes (client_addr, method, full_path, http_version, status_code)
+        args = record.args
+        if isinstance(args, tuple) and len(args) == 5 and isinstance(args[2], str):
+            path = args[2].split("?", 1)[0]
+            return path if path in self.polling_endpoints else None
+
+        # Unknown record layout, fall back to searching the formatted message
+        match = self._poll_re.search(record.getMessage())
+        return match.group(0) if match else None
 
     def filter(self, record):
         # Only filter uvicorn access logs
@@ -91,19 +145,19 @@ class AccessLogFilter(logging.Filter):
             return True
 
         # Check if this is a polling endpoint
-        for endpoint in self.polling_endpoints:
-            if endpoint in record.getMessage():
-                # Only log once every 10 seconds per endpoint
-                current_time = time.time()
-                last_time = self.last_logged.get(endpoint, 0)
+        endpoint = self._polling_endpoint(record)
+        if endpoint is None:
+            # Log all other requests
+            return True
 
-                if current_time - last_time > 10:
-                    self.last_logged[endpoint] = current_time
-                    return True
-                return False
+        # Only log once every 10 seconds per endpoint
+        current_time = time.monotonic_ns()
+        last_time = self.last_logged[endpoint]
 
-        # Log all other requests
-        return True
+        if last_time is None or current_time - last_time > _ACCESS_LOG_INTERVAL_NS:
+            self.last_logged[endpoint] = current_time
+            return True
+        return False
 
 
 # Add the filter to the uvicorn.access logger
@@ -120,8 +174,17 @@ config.set_version(VERSION)
 # Mount static files with cache busting
 app.mount("/static", StaticFiles(directory=static_dir), name="static")
 
-# Processing thread
-processing_thread = None
+# Processing task, running the synchronous processor in a worker thread
+processing_task: Optional[asyncio.Task] = None
+
+# Serialized /current_object body, keyed by the ETag of the state it reflects
+_current_obj_cache: Optional[Tuple[str, bytes]] = None
+
+# One event per connected /events client, set whenever the state changes
+_event_subscribers: Set[asyncio.Event] = set()
+
+# Seconds between keep-alive comments on an idle /events stream
+_SSE_KEEPALIVE_SECONDS = 15
 
 
 # Connect UI manager to JSON processor
@@ -133,24 +196,43 @@ def update_progress_callback(file_index, total_files, obj_index, total_objects):
 json_processor._notify_progress = update_progress_callback
 
 
+def _state_etag(*extra: object) -> str:
+    """Build a weak ETag from the processor state version."""
+    parts = [str(json_processor.get_state_version())]
+    parts.extend(str(part) for part in extra)
+    return f'W/"{"-".join(parts)}"'
+
+
+def _not_modified(request: Request, etag: str) -> Optional[Response]:
+    """Return a bare 304 response if the client already holds this ETag."""
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
+
+
+# String decisions mapped to their value and label
+_DECISION_MAP = {"true": (True, "vulnerable"), "false": (False, "not vulnerable")}
+
+# Labels for numeric decisions (True/False hash like 1/0)
+_NUM_LABEL = {1: "vulnerable", 0: "not vulnerable", -1: "not relevant"}
+
+
 class Decision(BaseModel):
     """Model for user decisions."""
 
     decision: Union[int, bool, str]  # Allow multiple types for decision
 
 
-@app.get("/favicon.ico")
+@app.api_route("/favicon.ico", methods=["GET", "HEAD"])
 async def favicon():
-    """Serve the favicon."""
-    response = FileResponse(os.path.join(static_dir, "favicon.ico"))
-    # Add cache control headers
-    response.headers["Cache-Control"] = "public, max-age=31536000"  # 1 year
-    return response
+    """Redirect to the versioned favicon served by the static mount."""
+    return RedirectResponse(url=f"/static/favicon.ico?v={VERSION}", status_code=301)
 
 
 @app.get("/", response_class=HTMLResponse)
-async def index(request: Request):
+def index(request: Request):
     """Serve the main index page."""
+    # Plain def: template loading and rendering block, so FastAPI runs this in its threadpool
     try:
         # Pass the config object to the template
         return templates.TemplateResponse(
@@ -161,20 +243,51 @@ async def index(request: Request):
         return JSONResponse(content={"error": "Internal server error"}, status_code=500)
 
 
+def _log_processing_result(task: asyncio.Task) -> None:
+    """Log an unexpected failure of the processing task."""
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Processing task failed: {str(task.exception())}")
+    # The task state is part of the processing status pushed to /events
+    _wake_event_subscribers()
+
+
+def _wake_event_subscribers() -> None:
+    """Wake every /events stream so it pushes the new state."""
+    for event in _event_subscribers:
+        event.set()
+
+
+@app.on_event("startup")
+async def register_state_listener():
+    """Forward processor state changes, possibly from its thread, to the event loop."""
+    loop = asyncio.get_running_loop()
+
+    def on_state_changed() -> None:
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(_wake_event_subscribers)
+
+    json_processor.add_state_listener(on_state_changed)
+
+
+def _is_processing_task_alive() -> bool:
+    """Check whether the processing task is still running."""
+    return processing_task is not None and not processing_task.done()
+
+
 @app.get("/start_processing")
 async def start_processing():
-    """Start the JSON processing thread."""
-    global processing_thread
-    if processing_thread is None or not processing_thread.is_alive():
+    """Start the JSON processing task."""
+    global processing_task
+    if not _is_processing_task_alive():
         input_dir = config.get_input_dir()
         output_dir = config.get_output_dir()
         logger.info(
             f"Starting processing with input_dir={input_dir}, output_dir={output_dir}"
         )
-        processing_thread = threading.Thread(
-            target=json_processor.process_json_files, args=(input_dir, output_dir)
+        processing_task = asyncio.create_task(
+            asyncio.to_thread(json_processor.process_json_files, input_dir, output_dir)
         )
-        processing_thread.start()
+        processing_task.add_done_callback(_log_processing_result)
         return {"status": "Processing started"}
     else:
         return {"status": "Processing already in progress"}
@@ -182,42 +295,56 @@ async def start_processing():
 
 @app.get("/stop_processing")
 async def stop_processing():
-    """Stop the JSON processing thread."""
-    global processing_thread
-    if processing_thread and processing_thread.is_alive():
+    """Stop the JSON processing task."""
+    if _is_processing_task_alive():
         if json_processor.is_currently_processing():
-            # Signal the processor to stop
+            # Signal the processor to stop; the task finishes when the worker
+            # thread returns. Cancelling it would only detach the task from a
+            # thread that keeps running, so a new run could start alongside it.
             json_processor.request_stop_processing()
             logger.info("Stop processing requested and signal sent")
             return {"status": "Processing stop requested"}
         else:
-            # Thread is alive but not processing (might be finishing up)
-            logger.info("Processing thread is alive but not actively processing")
+            # Task is alive but not processing (might be finishing up)
+            logger.info("Processing task is alive but not actively processing")
             return {"status": "No active processing to stop"}
     else:
-        logger.info("No processing thread running")
+        logger.info("No processing task running")
         return {"status": "No processing in progress"}
 
 
-@app.get("/check_input_directory")
-async def check_input_directory():
-    """Check if the input directory exists and has files to process."""
-    input_dir = config.get_input_dir()
+# Cached JSON file counts per directory, keyed by the directory mtime
+_dir_cache = {}
+
+
+def _count_json_files(path: str) -> int:
+    """Count the JSON files in a directory without stat-ing each entry."""
+    # Adding or removing a file bumps the directory mtime, so an unchanged
+    # mtime means the cached count is still valid
+    mtime = os.stat(path).st_mtime_ns
+    cached = _dir_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with os.scandir(path) as entries:
+        count = sum(1 for entry in entries if entry.name.endswith(".json"))
+    _dir_cache[path] = (mtime, count)
+    return count
+
 
+def _scan_directories(input_dir: str, output_dir: str) -> dict:
+    """Count input and processed JSON files in a single pass off the event loop."""
     # Check if directory exists
     if not os.path.exists(input_dir):
         return {"exists": False, "file_count": 0, "processed_count": 0}
 
     # Count JSON files in directory
-    json_files = [f for f in os.listdir(input_dir) if f.endswith(".json")]
-    file_count = len(json_files)
+    file_count = _count_json_files(input_dir)
 
     # Count processed files
-    output_dir = config.get_output_dir()
     processed_count = 0
     if os.path.exists(output_dir):
-        processed_files = [f for f in os.listdir(output_dir) if f.endswith(".json")]
-        processed_count = len(processed_files)
+        processed_count = _count_json_files(output_dir)
 
     return {
         "exists": True,
@@ -226,9 +353,18 @@ async def check_input_directory():
     }
 
 
-@app.get("/progress")
-async def get_progress():
-    """Get the current processing progress."""
+@app.get("/check_input_directory")
+async def check_input_directory():
+    """Check if the input directory exists and has files to process."""
+    input_dir = config.get_input_dir()
+    output_dir = config.get_output_dir()
+
+    # Directory scans block, so run both of them in one worker thread hop
+    return await asyncio.to_thread(_scan_directories, input_dir, output_dir)
+
+
+def _progress_payload() -> dict:
+    """Build the current processing progress."""
     file_progress, total_progress = ui_manager.get_progress()
     return {
         "file_progress": file_progress,
@@ -237,30 +373,24 @@ async def get_progress():
     }
 
 
-@app.get("/processing_status")
-async def get_processing_status():
-    """Get the current processing status."""
-    global processing_thread
-    is_thread_alive = processing_thread is not None and processing_thread.is_alive()
-    is_processing = json_processor.is_currently_processing()
-
+def _processing_status_payload() -> dict:
+    """Build the current processing status."""
     return {
-        "thread_alive": is_thread_alive,
-        "is_processing": is_processing,
+        "thread_alive": _is_processing_task_alive(),
+        "is_processing": json_processor.is_currently_processing(),
         "current_file": json_processor.get_current_filename() or "None",
     }
 
 
-@app.get("/current_object")
-async def current_object():
-    """Get the current object being processed."""
+def _current_object_body(etag: str) -> bytes:
+    """Serialize the current object, reusing the cached body for an unchanged state."""
+    global _current_obj_cache
+    if _current_obj_cache is not None and _current_obj_cache[0] == etag:
+        return _current_obj_cache[1]
+
     obj = json_processor.get_current_object()
 
     if obj:
-        # Create a copy to avoid modifying the original
-        response_obj = dict(obj)
-        response_obj["current_filename"] = json_processor.get_current_filename()
-
         # Get all identifiers for consistent logging
         obj_id = obj.get("id", "unknown")
         sub_id = obj.get("sub_id", "unknown")
@@ -269,7 +399,6 @@ async def current_object():
 
         # Add a flag to indicate if this object needs manual review
         needs_review = obj.get("relevance_label") is None
-        response_obj["needs_manual_review"] = needs_review
 
         # Log only once when a new object is available for manual review
         if needs_review:
@@ -278,10 +407,105 @@ async def current_object():
                 f"Serving object for manual review: {id_info}, File: {json_processor.get_current_filename()}"
             )
 
-        return response_obj
+        # Serialize once per state version, adding the extra fields without
+        # modifying the original
+        content = orjson.dumps(
+            {
+                **obj,
+                "current_filename": json_processor.get_current_filename(),
+                "needs_manual_review": needs_review,
+            }
+        )
     else:
-        # Return None without logging to reduce noise
-        return None
+        # Return null without logging to reduce noise
+        content = b"null"
+
+    _current_obj_cache = (etag, content)
+    return content
+
+
+@app.get("/progress")
+async def get_progress(request: Request, response: Response):
+    """Get the current processing progress."""
+    etag = _state_etag()
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+    response.headers["ETag"] = etag
+
+    return _progress_payload()
+
+
+@app.get("/processing_status")
+async def get_processing_status(request: Request, response: Response):
+    """Get the current processing status."""
+    # The task can outlive the last state change, so its liveness is part of the tag
+    etag = _state_etag(int(_is_processing_task_alive()))
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+    response.headers["ETag"] = etag
+
+    return _processing_status_payload()
+
+
+@app.get("/current_object")
+async def current_object(request: Request):
+    """Get the current object being processed."""
+    etag = _state_etag()
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+
+    return Response(
+        content=_current_object_body(etag),
+        media_type="application/json",
+        headers={"ETag": etag},
+    )
+
+
+def _sse_message(event: str, data: bytes) -> bytes:
+    """Format a single Server-Sent Events message."""
+    return b"event: " + event.encode() + b"\ndata: " + data + b"\n\n"
+
+
+async def _state_events(request: Request) -> AsyncIterator[bytes]:
+    """Yield progress, status and current object messages whenever the state changes."""
+    event = asyncio.Event()
+    _event_subscribers.add(event)
+    try:
+        last_state = None
+        while not await request.is_disconnected():
+            # Clear before reading the state so a change during the read wakes us again
+            event.clear()
+            state = (json_processor.get_state_version(), _is_processing_task_alive())
+            if state != last_state:
+                last_state = state
+                yield _sse_message("progress", orjson.dumps(_progress_payload()))
+                yield _sse_message(
+                    "processing_status", orjson.dumps(_processing_status_payload())
+                )
+                yield _sse_message(
+                    "current_object", _current_object_body(_state_etag())
+                )
+
+            try:
+                await asyncio.wait_for(event.wait(), timeout=_SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+    finally:
+        _event_subscribers.discard(event)
+
+
+@app.get("/events")
+async def events(request: Request):
+    """Push progress, processing status and the current object as Server-Sent Events."""
+    return StreamingResponse(
+        _state_events(request),
+        media_type="text/event-stream",
+        # identity encoding keeps GZipMiddleware from buffering the stream
+        headers={"Content-Encoding": "identity", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.post("/submit_decision")
@@ -298,38 +522,27 @@ async def submit_decision(decision: Decision):
         else:
             id_info = "unknown object"
 
-        logger.info(f"Received decision for {id_info}: {decision.decision}")
+        logger.info("Received decision for %s: %s", id_info, decision.decision)
 
         # Convert the decision to the correct type
-        if isinstance(decision.decision, str):
-            if decision.decision.lower() == "true":
-                decision_value = True
-                decision_str = "vulnerable"
-            elif decision.decision.lower() == "false":
-                decision_value = False
-                decision_str = "not vulnerable"
-            else:
-                decision_value = int(decision.decision)
-                decision_str = (
-                    "not relevant"
-                    if decision_value == -1
-                    else f"unknown ({decision_value})"
-                )
+        pair = (
+            _DECISION_MAP.get(decision.decision.lower())
+            if isinstance(decision.decision, str)
+            else None
+        )
+        if pair:
+            decision_value, decision_str = pair
         else:
-            decision_value = decision.decision
-            decision_str = (
-                "vulnerable"
-                if decision_value == 1 or decision_value is True
-                else "not vulnerable"
-                if decision_value == 0 or decision_value is False
-                else "not relevant"
-                if decision_value == -1
-                else f"unknown ({decision_value})"
+            decision_value = (
+                int(decision.decision)
+                if isinstance(decision.decision, str)
+                else decision.decision
             )
+            decision_str = _NUM_LABEL.get(decision_value, f"unknown ({decision_value})")
 
-        logger.info(f"Converted decision for {id_info}: {decision_str}")
+        logger.info("Converted decision for %s: %s", id_info, decision_str)
         json_processor.set_user_decision(decision_value)
-        logger.info(f"Decision for {id_info} processed successfully")
+        logger.info("Decision for %s processed successfully", id_info)
         return {"status": "Decision received"}
     except Exception as e:
         # Try to get object info even in case of error
@@ -358,4 +571,19 @@ async def get_notifications():
 
 # This file is meant to be run with uvicorn
 # Use: uvicorn main:app --host 0.0.0.0 --port 8080
-# Or use the start.sh script
+# Or use the start.sh script, or run this file directly
+if __name__ == "__main__":
+    import uvicorn
+
+    # Processing state lives in this process, so keep a single worker:
+    # with several workers each poll could land on a different processor.
+    # uvicorn's default loop and http settings pick uvloop and httptools when
+    # they are installed (see requirements.txt) and fall back otherwise, e.g.
+    # to asyncio on Windows, where uvloop is not available. The access log stays
+    # on, thinned out by AccessLogFilter, as with start.sh.
+    uvicorn.run(
+        "main:app",
+        host=config.get_server_host(),
+        port=config.get_server_port(),
+        workers=1,
+    )
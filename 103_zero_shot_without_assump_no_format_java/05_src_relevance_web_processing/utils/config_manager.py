@@ -9,6 +9,12 @@ from typing import Any, Dict, Optional
 
 import yaml
 
+# Prefer the libyaml-backed loader and fall back to the pure-Python one
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
 
 class ConfigManager:
     """
@@ -32,7 +38,7 @@ class ConfigManager:
         config_path = os.path.join("config", "config.yaml")
         try:
             with open(config_path, "r") as file:
-                self._config = yaml.safe_load(file)
+                self._config = yaml.load(file, Loader=_Loader)
             logging.info(f"Configuration loaded successfully from {config_path}")
         except Exception as e:
             logging.error(f"Error loading configuration from {config_path}: {str(e)}")
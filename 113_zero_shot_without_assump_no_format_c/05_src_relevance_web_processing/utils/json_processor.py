@@ -3,12 +3,13 @@ JSON Processing Utility for the LLM Vulnerability Function Localization Web Proc
 
 """
 
+import itertools
 import json
 import logging
 import os
 import threading
 import time
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Union
 
 from utils.config_manager import config
 
@@ -26,6 +27,9 @@ class JsonProcessor:
         self.processing_paused = threading.Event()
         self.stop_processing = threading.Event()
         self.is_processing = False
+        self.state_version = 0
+        self._version_counter = itertools.count(1)
+        self._state_listeners: List[Callable[[], None]] = []
         self.logger = logging.getLogger(__name__)
 
         # Create output directory if it doesn't exist
@@ -51,6 +55,35 @@ class JsonProcessor:
         except (TypeError, ValueError):
             return decision
 
+    def _mark_state_changed(self) -> None:
+        """
+        Advance the state version so polling clients see a new ETag.
+        """
+        # next() on itertools.count is atomic, so no lock is needed
+        self.state_version = next(self._version_counter)
+        for listener in self._state_listeners:
+            listener()
+
+    def add_state_listener(self, listener: Callable[[], None]) -> None:
+        """
+        Register a callback invoked after every state change.
+
+        The callback may run on the processing thread, so it must be thread-safe.
+
+        Args:
+            listener: Callable taking no arguments
+        """
+        self._state_listeners.append(listener)
+
+    def get_state_version(self) -> int:
+        """
+        Get the version of the processing state observed by the UI.
+
+        Returns:
+            A counter that increases whenever the polled state changes
+        """
+        return self.state_version
+
     def get_current_object(self) -> Optional[Dict[str, Any]]:
         """
         Get the current object being processed.
@@ -101,6 +134,7 @@ class JsonProcessor:
         )
         self.user_decision = normalized_decision
         self.processing_paused.set()  # Resume processing
+        self._mark_state_changed()
         self.logger.info(f"User decision set successfully for {id_info}")
 
     def get_processed_status(self) -> List[Dict[str, Any]]:
@@ -146,6 +180,7 @@ class JsonProcessor:
         # Reset stop flag and set processing flag
         self.stop_processing.clear()
         self.is_processing = True
+        self._mark_state_changed()
 
         # Create output directory if it doesn't exist
         os.makedirs(output_dir, exist_ok=True)
@@ -159,9 +194,11 @@ class JsonProcessor:
             if self.stop_processing.is_set():
                 self.logger.info("Processing stopped by user request")
                 self.is_processing = False
+                self._mark_state_changed()
                 return
 
             self.current_filename = filename
+            self._mark_state_changed()
             input_path = os.path.join(input_dir, filename)
             output_path = os.path.join(output_dir, filename)
 
@@ -177,6 +214,7 @@ class JsonProcessor:
                     if self.stop_processing.is_set():
                         self.logger.info("Processing stopped by user request")
                         self.is_processing = False
+                        self._mark_state_changed()
                         return
 
                     self.current_object = obj
@@ -190,6 +228,7 @@ class JsonProcessor:
                         f"Processing object {obj_index}/{total_objects} from file {filename} - ID={obj_id}, Sub ID={sub_id}, Code ID={code_id}"
                     )
                     self._process_json_object(obj)
+                    self._mark_state_changed()
 
                     # Get all identifiers for consistent logging
                     obj_id = obj.get("id", "unknown")
@@ -212,6 +251,7 @@ class JsonProcessor:
                                         f"Processing stopped while waiting for user decision on object: {id_info}"
                                     )
                                     self.is_processing = False
+                                    self._mark_state_changed()
                                     return
                                 time.sleep(0.1)  # Wait for user decision
                         else:
@@ -229,6 +269,7 @@ class JsonProcessor:
                             continue
 
                         self._apply_user_decision(obj, decision_value, id_info)
+                        self._mark_state_changed()
 
                     self.processed_objects.append(
                         {
@@ -248,6 +289,7 @@ class JsonProcessor:
                     self._notify_progress(
                         file_index, total_files, obj_index, total_objects
                     )
+                    self._mark_state_changed()
 
                 with open(output_path, "w") as f:
                     json.dump(data, f, indent=2)
@@ -259,6 +301,7 @@ class JsonProcessor:
 
         # Processing completed successfully
         self.is_processing = False
+        self._mark_state_changed()
         self.logger.info("All files processed successfully")
 
     def _process_json_object(self, obj: Dict[str, Any]) -> Dict[str, Any]:
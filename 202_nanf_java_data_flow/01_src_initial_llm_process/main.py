@@ -18,21 +18,27 @@ Arguments:
 
 import os
 import sys
-import json
+import math
+import asyncio
 import argparse
+import functools
+import itertools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
 
 # Import utility modules
 from utils.config_loader import load_config
 from utils.logger import Logger
 from utils.data_handler import (
-    load_json_data, stream_json_data, ensure_directories, is_model_completed,
+    load_json_data, stream_json_data, count_json_entries, ensure_directories, is_model_completed,
     find_resume_point, write_to_json, save_resume_point
 )
 from utils.llm_processor import (
-    extract_fields, generate_prompt, interact_with_llm
+    extract_fields, generate_prompt, interact_with_llm, unload_model, get_model_digest
 )
-from utils.time_estimator import TimeEstimator
+from utils.time_estimator import TimeEstimator, load_processing_times
+from utils.prompt_cache import PromptCache, hash_prompt
 
 
 class LLMVulProcessor:
@@ -68,9 +74,20 @@ class LLMVulProcessor:
 
         # Initialize data
         self.data = None
+        self.total_entries = None
         self.models = self.config['models']
         self.result_dir = self.config['output']['result_dir']
 
+        # Number of entries sent to the LLM at the same time
+        self.concurrency = max(1, int(self.config.get('concurrency', 1)))
+
+        # Responses to prompts that were already answered are reused when enabled
+        self.prompt_cache = None
+        if self.config.get('prompt_cache', False):
+            self.prompt_cache = PromptCache(
+                os.path.join(self.config['output']['log_dir'], 'prompt_cache.sqlite')
+            )
+
     def load_data(self):
         """
         Load the dataset from the configured location.
@@ -93,6 +110,23 @@ class LLMVulProcessor:
             self.config['data']['dataset_file']
         )
 
+    def get_total_entries(self):
+        """
+        Get the number of entries in the dataset.
+        Unless the dataset is already loaded, the entries are counted by streaming
+        the file, so it never has to be held in memory.
+
+        Returns:
+            int: Number of entries in the dataset
+        """
+        if self.total_entries is None:
+            if self.data is not None:
+                self.total_entries = len(self.data)
+            else:
+                self.total_entries = count_json_entries(self.get_dataset_path())
+                self.logger.info(f"Dataset contains {self.total_entries} entries")
+        return self.total_entries
+
     def process_model(self, model_name):
         """
         Process all entries for a specific model.
@@ -110,12 +144,12 @@ class LLMVulProcessor:
         log_dir = self.config['output']['log_dir']
 
         # Skip if model has completed all entries
-        if is_model_completed(model_name, self.data, self.result_dir, log_dir):
+        if is_model_completed(model_name, total_entries, self.result_dir, log_dir):
             self.logger.success(f"Skipping {model_name} - already completed all {total_entries} entries")
             return True
 
         # Find resume point
-        start_idx = find_resume_point(model_name, self.data, self.result_dir, log_dir)
+        start_idx = find_resume_point(model_name, total_entries, self.result_dir, log_dir)
         remaining = total_entries - start_idx
 
         self.logger.info(f"Resuming {model_name} from index {start_idx}/{total_entries} "
@@ -137,7 +171,7 @@ class LLMVulProcessor:
 
                     # Generate prompt and interact with LLM
                     custom_prompt = generate_prompt(code, filename, data_flow_info)
-                    new_entry = interact_with_llm(entry, custom_prompt, model_name, self.config)
+                    new_entry = self._interact_with_llm(entry, custom_prompt, model_name)
                     write_to_json(new_entry, model_name, self.result_dir)
 
                     # End timing and get estimates
@@ -165,13 +199,47 @@ class LLMVulProcessor:
                     continue
 
         # Check if we've completed all entries
-        if is_model_completed(model_name, self.data, self.result_dir, log_dir):
+        if is_model_completed(model_name, total_entries, self.result_dir, log_dir):
             self.logger.success(f"Completed processing all entries for {model_name}")
             return True
         else:
             self.logger.warning(f"Processing for {model_name} is incomplete. Run again to continue.")
             return False
 
+    def _interact_with_llm(self, entry, custom_prompt, model_name):
+        """
+        Get the model's response to a prompt, reusing the cached response
+        if the same request was already answered.
+
+        Args:
+            entry (dict): The data entry containing identification information
+            custom_prompt (str): The prompt to send to the model
+            model_name (str): Name of the model to use
+
+        Returns:
+            dict: A new entry with the model's response and performance metrics
+        """
+        if self.prompt_cache is None:
+            return interact_with_llm(entry, custom_prompt, model_name, self.config)
+
+        # Without the digest, a cached response could come from other weights under the same tag
+        model_digest = get_model_digest(model_name, self.config)
+        if model_digest is None:
+            return interact_with_llm(entry, custom_prompt, model_name, self.config)
+
+        cache_key = hash_prompt(model_name, model_digest, custom_prompt, self.config)
+        new_entry = self.prompt_cache.get(cache_key, entry)
+        if new_entry is not None:
+            self.logger.info(
+                f"Using cached response from {model_name} - ID: {new_entry['id']}, "
+                f"Sub_ID: {new_entry['sub_id']}, Code_ID: {new_entry['code_id']}"
+            )
+            return new_entry
+
+        new_entry = interact_with_llm(entry, custom_prompt, model_name, self.config)
+        self.prompt_cache.set(cache_key, new_entry)
+        return new_entry
+
     def _format_time_duration(self, seconds):
         """
         Format a time duration in seconds to a human-readable string.
@@ -202,38 +270,26 @@ class LLMVulProcessor:
         Returns:
             tuple: (model_estimate, avg_time, has_data)
         """
-        from utils.llm_processor import sanitize_model_name
-
-        total_entries = len(self.data)
+        total_entries = self.get_total_entries()
         log_dir = self.config['output']['log_dir']
 
-        # Check if we have timing data for this model
-        times_dir = os.path.join(log_dir, "processing_times")
-        if not os.path.exists(times_dir):
-            return 0, 0, False
-
-        times_file = os.path.join(times_dir, f"{sanitize_model_name(model_name)}_times.json")
-        if not os.path.exists(times_file) or os.path.getsize(times_file) == 0:
-            return 0, 0, False
-
         try:
-            with open(times_file, 'r') as file:
-                data = json.load(file)
-                times = data.get('processing_times', [])
-                if not times:
-                    return 0, 0, False
-
-                avg_time = sum(times) / len(times)
-
-                # If model is not completed, estimate remaining time
-                if not is_model_completed(model_name, self.data, self.result_dir, log_dir):
-                    start_idx = find_resume_point(model_name, self.data, self.result_dir, log_dir)
-                    remaining = total_entries - start_idx
-                    model_estimate = avg_time * remaining
-                else:
-                    model_estimate = 0  # Model is already completed
-
-                return model_estimate, avg_time, True
+            # Check if we have timing data for this model
+            times = load_processing_times(model_name, log_dir)
+            if not times:
+                return 0, 0, False
+
+            avg_time = math.fsum(times) / len(times)
+
+            # If model is not completed, estimate remaining time
+            if not is_model_completed(model_name, total_entries, self.result_dir, log_dir):
+                start_idx = find_resume_point(model_name, total_entries, self.result_dir, log_dir)
+                remaining = total_entries - start_idx
+                model_estimate = avg_time * remaining
+            else:
+                model_estimate = 0  # Model is already completed
+
+            return model_estimate, avg_time, True
         except Exception as e:
             self.logger.warning(f"Error reading timing data for {model_name}: {e}")
             return 0, 0, False
@@ -331,18 +387,16 @@ class LLMVulProcessor:
         log_dir = self.config['output']['log_dir']
 
         # Count total entries (we need this for progress tracking)
-        # This is a one-time operation that still reads the whole file, but doesn't keep it in memory
-        if self.data is None:
-            self.load_data()  # This is inefficient but needed for compatibility with other methods
-        total_entries = len(self.data)
+        # The count is saved next to the dataset, so this only parses the file once
+        total_entries = self.get_total_entries()
 
         # Skip if model has completed all entries
-        if is_model_completed(model_name, self.data, self.result_dir, log_dir):
+        if is_model_completed(model_name, total_entries, self.result_dir, log_dir):
             self.logger.success(f"Skipping {model_name} - already completed all {total_entries} entries")
             return True
 
         # Find resume point
-        start_idx = find_resume_point(model_name, self.data, self.result_dir, log_dir)
+        start_idx = find_resume_point(model_name, total_entries, self.result_dir, log_dir)
         remaining = total_entries - start_idx
 
         self.logger.info(f"Resuming {model_name} from index {start_idx}/{total_entries} "
@@ -355,54 +409,149 @@ class LLMVulProcessor:
         with tqdm(total=remaining, desc=f"Processing {model_name}",
                 bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}, {rate_fmt}]") as pbar:
 
-            # Stream the JSON data
-            for idx, entry in enumerate(stream_json_data(dataset_path)):
-                # Skip entries before the resume point
-                if idx < start_idx:
-                    continue
+            # Stream the JSON data, starting at the resume point; entries before it
+            # are dropped straight from the parser without going through the loop
+            entries = enumerate(
+                itertools.islice(stream_json_data(dataset_path), start_idx, None),
+                start=start_idx
+            )
+            asyncio.run(self._process_entries(
+                model_name, entries, total_entries, time_estimator, log_dir, pbar
+            ))
 
-                try:
-                    # Start timing this entry
-                    time_estimator.start_entry()
+        # Check if we've completed all entries
+        if is_model_completed(model_name, total_entries, self.result_dir, log_dir):
+            self.logger.success(f"Completed processing all entries for {model_name}")
+            return True
+        else:
+            self.logger.warning(f"Processing for {model_name} is incomplete. Run again to continue.")
+            return False
 
-                    code, filename, entry_id, sub_id, code_id, data_flow_info = extract_fields(entry)
+    async def _process_entries(self, model_name, entries, total_entries, time_estimator, log_dir, pbar):
+        """
+        Send entries to the LLM concurrently and write their results in dataset order.
 
-                    # Generate prompt and interact with LLM
-                    custom_prompt = generate_prompt(code, filename, data_flow_info)
-                    new_entry = interact_with_llm(entry, custom_prompt, model_name, self.config)
-                    write_to_json(new_entry, model_name, self.result_dir)
+        Up to self.concurrency requests are in flight at once. Results are written
+        in the order of the dataset by a single writer thread, so the file I/O overlaps
+        with the requests in flight and the saved resume point never moves past an
+        entry whose result has not been written yet.
 
-                    # End timing and get estimates
-                    time_estimates = time_estimator.end_entry()
+        Args:
+            model_name (str): Name of the model to process
+            entries (iterable): (index, entry) pairs to process
+            total_entries (int): Total number of entries in the dataset
+            time_estimator (TimeEstimator): Time estimator for this model
+            log_dir (str): Directory for log files
+            pbar (tqdm): Progress bar to update after each written entry
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.concurrency)
 
-                    # Save resume point with time estimates
-                    save_resume_point(model_name, entry, idx+1, total_entries, log_dir, time_estimates)
+        async def query(entry):
+            code, filename, _, _, _, data_flow_info = extract_fields(entry)
 
-                    # Detailed progress and time logging
-                    self.logger.separator("-", 60)
-                    self.logger.progress(
-                        idx+1, total_entries,
-                        f"- ID: {entry_id}, Sub_ID: {sub_id}, Code_ID: {code_id}"
-                    )
-                    self.logger.time_estimate(idx+1, total_entries, time_estimates)
+            # Generate prompt and interact with LLM; the client is blocking, so it runs in a thread
+            custom_prompt = generate_prompt(code, filename, data_flow_info)
+            async with semaphore:
+                return await loop.run_in_executor(
+                    None, functools.partial(self._interact_with_llm, entry, custom_prompt, model_name)
+                )
 
-                    # Update progress bar
-                    pbar.update(1)
+        # Entries whose requests have been started, oldest first
+        pending = deque()
 
-                except Exception as e:
-                    self.logger.error(
-                        f"Failed processing {model_name} - Index: {idx+1}/{total_entries} "
-                        f"- ID: {entry_id}, Sub_ID: {sub_id}, Code_ID: {code_id}: {e}"
-                    )
-                    continue
+        # With concurrent requests, the time between two written entries is
+        # what each entry adds to the total time
+        time_estimator.start_entry()
 
-        # Check if we've completed all entries
-        if is_model_completed(model_name, self.data, self.result_dir, log_dir):
-            self.logger.success(f"Completed processing all entries for {model_name}")
-            return True
-        else:
-            self.logger.warning(f"Processing for {model_name} is incomplete. Run again to continue.")
-            return False
+        writer = ThreadPoolExecutor(max_workers=1)
+        try:
+            for idx, entry in entries:
+                pending.append((idx, entry, asyncio.ensure_future(query(entry))))
+                if len(pending) > self.concurrency:
+                    await self._write_result(model_name, *pending.popleft(), total_entries,
+                                             time_estimator, log_dir, pbar, writer)
+
+            while pending:
+                await self._write_result(model_name, *pending.popleft(), total_entries,
+                                         time_estimator, log_dir, pbar, writer)
+        finally:
+            # Finish the writes already queued, also when the run is interrupted
+            writer.shutdown(wait=True)
+
+    async def _write_result(self, model_name, idx, entry, task, total_entries, time_estimator, log_dir, pbar, writer):
+        """
+        Wait for the LLM response to one entry, then queue writing it and saving the resume point.
+
+        Args:
+            model_name (str): Name of the model being processed
+            idx (int): Index of the entry in the dataset
+            entry (dict): The entry being processed
+            task (asyncio.Future): Future resolving to the new entry from interact_with_llm
+            total_entries (int): Total number of entries in the dataset
+            time_estimator (TimeEstimator): Time estimator for this model
+            log_dir (str): Directory for log files
+            pbar (tqdm): Progress bar to update
+            writer (ThreadPoolExecutor): Single-thread executor that saves the results
+        """
+        entry_id = entry.get('id', 'Unknown')
+        sub_id = entry.get('sub_id', 'Unknown')
+        code_id = entry.get('code_id', 'Unknown')
+
+        try:
+            new_entry = await task
+
+            # End timing and get estimates
+            time_estimates = time_estimator.end_entry()
+
+            # Write the result and save the resume point with time estimates
+            writer.submit(
+                self._save_result, model_name, new_entry, entry, idx, total_entries, log_dir, time_estimates
+            )
+
+            # Detailed progress and time logging
+            self.logger.separator("-", 60)
+            self.logger.progress(
+                idx+1, total_entries,
+                f"- ID: {entry_id}, Sub_ID: {sub_id}, Code_ID: {code_id}"
+            )
+            self.logger.time_estimate(idx+1, total_entries, time_estimates)
+
+            # Update progress bar
+            pbar.update(1)
+
+        except Exception as e:
+            self.logger.error(
+                f"Failed processing {model_name} - Index: {idx+1}/{total_entries} "
+                f"- ID: {entry_id}, Sub_ID: {sub_id}, Code_ID: {code_id}: {e}"
+            )
+
+        # Start timing the next entry
+        time_estimator.start_entry()
+
+    def _save_result(self, model_name, new_entry, entry, idx, total_entries, log_dir, time_estimates):
+        """
+        Write the result for one entry, then save the resume point after it.
+        Runs on the writer thread, which saves results in the order they are queued.
+
+        Args:
+            model_name (str): Name of the model being processed
+            new_entry (dict): The entry returned by interact_with_llm
+            entry (dict): The entry being processed
+            idx (int): Index of the entry in the dataset
+            total_entries (int): Total number of entries in the dataset
+            log_dir (str): Directory for log files
+            time_estimates (dict): Time estimation data
+        """
+        try:
+            write_to_json(new_entry, model_name, self.result_dir)
+            save_resume_point(model_name, entry, idx+1, total_entries, log_dir, time_estimates)
+        except Exception as e:
+            self.logger.error(
+                f"Failed saving {model_name} - Index: {idx+1}/{total_entries} "
+                f"- ID: {entry.get('id', 'Unknown')}, Sub_ID: {entry.get('sub_id', 'Unknown')}, "
+                f"Code_ID: {entry.get('code_id', 'Unknown')}: {e}"
+            )
 
     def process_all_models(self):
         """
@@ -411,9 +560,6 @@ class LLMVulProcessor:
         Returns:
             int: Number of completed models
         """
-        if self.data is None:
-            self.load_data()
-
         total_models = len(self.models)
         completed_models = 0
 
@@ -440,6 +586,9 @@ class LLMVulProcessor:
             if self.process_model_streaming(model_name):
                 completed_models += 1
 
+            # The model stays loaded between its entries; free the memory for the next one
+            unload_model(model_name)
+
             model_elapsed = time.time() - model_start_time
             time_str = self._format_time_duration(model_elapsed)
             self.logger.success(f"Model {model_name} processing time: {time_str}")
@@ -468,9 +617,6 @@ class LLMVulProcessor:
             self.logger.section(f"Using machine configuration: {self.config['machine']['name']}")
             self.logger.separator()
 
-            # Load data
-            self.load_data()
-
             # Process all models
             completed_models = self.process_all_models()
             total_models = len(self.models)
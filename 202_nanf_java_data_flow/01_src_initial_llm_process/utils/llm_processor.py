@@ -8,6 +8,9 @@ API calls, and response processing.
 
 import re
 import json
+import time
+import threading
+import httpx
 import ollama
 
 from .logger import Logger
@@ -15,6 +18,102 @@ from .logger import Logger
 # Initialize logger
 logger = Logger()
 
+# How long Ollama keeps a model loaded after a request, unless set in the configuration.
+# Keeping it loaded between entries avoids reloading the weights and lets Ollama
+# reuse the cached system prompt; the model is unloaded once all its entries are done.
+DEFAULT_KEEP_ALIVE = "10m"
+
+# Seconds a host is passed over after a failed request, while other hosts are available
+HOST_RETRY_DELAY = 60
+
+# Ollama clients shared by all requests, one per configured host, created on first use.
+# For each client, its host, the number of requests in flight, and the time until
+# which it is passed over after a failure.
+_clients = []
+_hosts = {}
+_in_flight = {}
+_down_until = {}
+_clients_lock = threading.Lock()
+
+# Digests of the models' weights, by model name, looked up once per run
+_model_digests = {}
+
+
+def acquire_ollama_client(config):
+    """
+    Picks the Ollama host for a request: the one with the fewest requests in flight,
+    skipping hosts that failed recently unless all of them did.
+    Release the client with release_ollama_client when the request is done.
+
+    Args:
+        config (dict): Configuration parameters
+
+    Returns:
+        ollama.Client: Client whose requests time out after the configured number of seconds
+    """
+    with _clients_lock:
+        if not _clients:
+            # Without ollama_hosts, the client uses OLLAMA_HOST or the local server
+            for host in config.get('ollama_hosts') or [None]:
+                client = ollama.Client(host=host, timeout=config['llm']['timeout'])
+                _clients.append(client)
+                _hosts[client] = host or "default host"
+                _in_flight[client] = 0
+                _down_until[client] = 0
+
+        now = time.time()
+        available = [client for client in _clients if _down_until[client] <= now] or _clients
+        client = min(available, key=lambda c: _in_flight[c])
+        _in_flight[client] += 1
+        return client
+
+
+def release_ollama_client(client, failed=False):
+    """
+    Marks a request made with acquire_ollama_client as done.
+
+    Args:
+        client (ollama.Client): The client the request was made with
+        failed (bool, optional): Whether the host could not be reached or had a server error
+    """
+    with _clients_lock:
+        _in_flight[client] -= 1
+        if failed and len(_clients) > 1:
+            _down_until[client] = time.time() + HOST_RETRY_DELAY
+
+
+def get_model_digest(model_name, config):
+    """
+    Looks up the digest of a model's weights on an Ollama server, so a model that
+    was pulled again under the same tag can be told apart from the old one.
+
+    Args:
+        model_name (str): Name of the model
+        config (dict): Configuration parameters
+
+    Returns:
+        str: Digest of the model, or None if the server could not be asked or does not have the model
+    """
+    with _clients_lock:
+        if model_name in _model_digests:
+            return _model_digests[model_name]
+
+    client = acquire_ollama_client(config)
+    try:
+        models = client.list()['models']
+    except Exception as e:
+        release_ollama_client(client, failed=True)
+        logger.warning(f"Could not look up the digest of {model_name}: {e}")
+        return None
+    release_ollama_client(client)
+
+    # A name without a tag refers to the latest tag
+    names = {model_name, f"{model_name}:latest"}
+    digest = next((model['digest'] for model in models if model['model'] in names), None)
+    with _clients_lock:
+        _model_digests[model_name] = digest
+    return digest
+
 
 def sanitize_model_name(model_name):
     """
@@ -669,6 +768,7 @@ def generate_prompt(code, filename, data_flow_info=None):
 def call_ollama_chat(model_name, custom_prompt, system_prompt, config):
     """
     Helper function to encapsulate the ollama.chat call with appropriate parameters.
+    The request times out and is retried as configured in the llm section.
 
     Args:
         model_name (str): Name of the model to use
@@ -697,6 +797,11 @@ def call_ollama_chat(model_name, custom_prompt, system_prompt, config):
         **ollama_options
     }
 
+    # Cap the response length unless the Ollama options already do
+    max_output_tokens = config['llm']['max_output_tokens']
+    if max_output_tokens:
+        options.setdefault("num_predict", max_output_tokens)
+
     # Print prompts if verbose mode is enabled
     if config.get('verbose', False):
         logger.separator("=", 80)
@@ -709,26 +814,61 @@ def call_ollama_chat(model_name, custom_prompt, system_prompt, config):
         print(custom_prompt)
         logger.separator("=", 80)
 
-    try:
-        return ollama.chat(
-            model=model_name,
-            messages=[
-                {
-                    "role": "system",
-                    "content": system_prompt
-                },
-                {
-                    "role": "user",
-                    "content": custom_prompt
-                }
-            ],
-            options=options,
-            keep_alive=0,
-            stream=False
-        )
-    except Exception as e:
-        logger.error(f"Error calling Ollama API with model {model_name}: {e}")
-        raise
+    # Retry timeouts, connection errors and server errors, waiting longer each time;
+    # with several hosts, the retry goes to another host
+    max_retries = config['llm']['max_retries']
+    for attempt in range(max_retries + 1):
+        client = acquire_ollama_client(config)
+        transient = False
+        try:
+            return client.chat(
+                model=model_name,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": system_prompt
+                    },
+                    {
+                        "role": "user",
+                        "content": custom_prompt
+                    }
+                ],
+                options=options,
+                keep_alive=config.get('keep_alive', DEFAULT_KEEP_ALIVE),
+                stream=False
+            )
+        except (httpx.TransportError, ollama.ResponseError) as e:
+            transient = not isinstance(e, ollama.ResponseError) or e.status_code >= 500
+            if not transient or attempt == max_retries:
+                logger.error(f"Error calling Ollama API with model {model_name}: {e}")
+                raise
+            delay = 2 ** attempt
+            logger.warning(f"Error calling Ollama API with model {model_name}: {e}. "
+                           f"Retrying in {delay}s ({attempt + 1}/{max_retries})")
+        except Exception as e:
+            logger.error(f"Error calling Ollama API with model {model_name}: {e}")
+            raise
+        finally:
+            release_ollama_client(client, failed=transient)
+        time.sleep(delay)
+
+
+def unload_model(model_name):
+    """
+    Unloads a model from the memory of every Ollama host so the next model has room.
+
+    Args:
+        model_name (str): Name of the model to unload
+    """
+    with _clients_lock:
+        clients = list(_clients)
+
+    for client in clients:
+        try:
+            client.generate(model=model_name, keep_alive=0)
+            logger.info(f"Unloaded {model_name} from {_hosts[client]}")
+        except Exception as e:
+            logger.warning(f"Error unloading {model_name} from {_hosts[client]}: {e}")
 
 
 def extract_fields(entry):
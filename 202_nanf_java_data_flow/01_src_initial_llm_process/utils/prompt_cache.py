@@ -0,0 +1,130 @@
+"""
+Prompt cache for LLM vulnerability function localization.
+
+This module stores LLM responses in a SQLite database, keyed by a hash of
+everything sent to the model, so a prompt that was already answered in this
+or an earlier run is not sent again.
+
+"""
+
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+
+from .logger import Logger
+
+# Initialize logger
+logger = Logger()
+
+# Performance metrics of an entry, which only describe the request that produced it
+METRIC_FIELDS = ('total_duration', 'load_duration', 'prompt_eval_count',
+                 'prompt_eval_duration', 'eval_count', 'eval_duration')
+
+
+def hash_prompt(model_name, model_digest, custom_prompt, config):
+    """
+    Compute the cache key for a request.
+
+    The key covers the model and the digest of its weights, its context window,
+    the Ollama options, the response length limit, and the system and user prompts,
+    so changing any of them invalidates the cached response.
+
+    Args:
+        model_name (str): Name of the model
+        model_digest (str): Digest of the model's weights
+        custom_prompt (str): The prompt sent to the model
+        config (dict): Configuration parameters
+
+    Returns:
+        str: Hex digest of the SHA-256 hash of the request
+    """
+    request = {
+        "model": model_name,
+        "digest": model_digest,
+        "num_ctx": config['models'].get(model_name, 0),
+        "options": config['ollama_options'],
+        "max_output_tokens": config['llm']['max_output_tokens'],
+        "system": config['system_prompt'],
+        "prompt": custom_prompt
+    }
+    return hashlib.sha256(json.dumps(request, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class PromptCache:
+    """
+    A persistent cache of LLM responses.
+
+    Entries are stored as the dictionaries returned by interact_with_llm.
+    Entries returned from the cache are marked with "cached": true and carry no
+    performance metrics, since none were measured for them.
+    Access is serialized with a lock, so the cache can be shared by the threads
+    that send requests concurrently.
+    """
+
+    def __init__(self, cache_file):
+        """
+        Open the cache database, creating it if needed.
+
+        Args:
+            cache_file (str): Path to the SQLite database file
+        """
+        self.cache_file = cache_file
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(cache_file, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(hash TEXT PRIMARY KEY, response TEXT NOT NULL, ts INTEGER NOT NULL)"
+        )
+        self._connection.commit()
+        logger.info(f"Using prompt cache {cache_file}")
+
+    def get(self, key, entry):
+        """
+        Look up the cached response for a request.
+
+        Args:
+            key (str): Cache key from hash_prompt
+            entry (dict): The data entry the response is for
+
+        Returns:
+            dict: A new entry for the given data entry, or None if the request is not cached
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT response FROM responses WHERE hash = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        # The cached response may have been made for another entry with the same prompt
+        new_entry = json.loads(row[0])
+        new_entry['id'] = entry.get('id', 'Unknown')
+        new_entry['sub_id'] = entry.get('sub_id', 'Unknown')
+        new_entry['code_id'] = entry.get('code_id', 'Unknown')
+
+        # The stored metrics were measured for the original request, not this one
+        for field in METRIC_FIELDS:
+            new_entry[field] = None
+        new_entry['cached'] = True
+        return new_entry
+
+    def set(self, key, new_entry):
+        """
+        Store the response for a request.
+
+        Args:
+            key (str): Cache key from hash_prompt
+            new_entry (dict): The entry returned by interact_with_llm
+        """
+        try:
+            with self._lock:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO responses (hash, response, ts) VALUES (?, ?, ?)",
+                    (key, json.dumps(new_entry), int(time.time()))
+                )
+                self._connection.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Error caching response - ID: {new_entry.get('id')}, "
+                           f"Sub_ID: {new_entry.get('sub_id')}, Code_ID: {new_entry.get('code_id')}: {e}")
@@ -10,16 +10,72 @@ for completion.
 import time
 import json
 import os
+import math
+import bisect
+from array import array
 from datetime import datetime, timedelta
-from statistics import mean, median, stdev
 from colorama import Fore
 
 from .logger import Logger
+from .llm_processor import sanitize_model_name
 
 # Initialize logger
 logger = Logger()
 
 
+def get_times_file_path(model_name, log_dir):
+    """
+    Get the path to the processing times file of a model.
+
+    The file holds one 8-byte float per processed entry, so a new time is
+    appended without rewriting the times recorded before it.
+
+    Args:
+        model_name (str): Name of the model
+        log_dir (str): Directory for log files
+
+    Returns:
+        str: Path to the processing times file
+    """
+    filename = f"{sanitize_model_name(model_name)}_times.bin"
+    return os.path.join(log_dir, "processing_times", filename)
+
+
+def load_processing_times(model_name, log_dir):
+    """
+    Load the processing times recorded for a model.
+
+    Times saved by earlier versions in <model>_times.json are converted to the
+    binary file on first use.
+
+    Args:
+        model_name (str): Name of the model
+        log_dir (str): Directory for log files
+
+    Returns:
+        array: Processing times in seconds, empty if none are recorded
+    """
+    times = array('d')
+    times_file = get_times_file_path(model_name, log_dir)
+
+    if not os.path.exists(times_file):
+        json_file = times_file[:-len('.bin')] + '.json'
+        if os.path.exists(json_file) and os.path.getsize(json_file) > 0:
+            with open(json_file, 'r') as file:
+                times.extend(json.load(file).get('processing_times', []))
+            with open(times_file, 'wb') as file:
+                times.tofile(file)
+            logger.info(f"Converted {len(times)} processing times for {model_name} to {times_file}")
+        return times
+
+    with open(times_file, 'rb') as file:
+        data = file.read()
+    # Drop a partial value left by an interrupted write
+    data = data[:len(data) - len(data) % times.itemsize]
+    times.frombytes(data)
+    return times
+
+
 class TimeEstimator:
     """
     A class for estimating processing times for LLM operations.
@@ -47,8 +103,13 @@ class TimeEstimator:
         
         # Time tracking
         self.start_time = time.time()
-        self.processing_times = []
+        self.processing_times = array('d')
         self.last_entry_start_time = None
+
+        # Running statistics, so estimates don't rescan all processing times
+        self._sorted_times = []
+        self._mean_time = 0.0
+        self._sum_sq_diff = 0.0
         
         # Load previous processing times if available
         self.load_processing_times()
@@ -60,15 +121,18 @@ class TimeEstimator:
         """
         Load processing times from a previous run if available.
         """
-        times_file = self._get_times_file_path()
-        if os.path.exists(times_file) and os.path.getsize(times_file) > 0:
-            try:
-                with open(times_file, 'r') as file:
-                    data = json.load(file)
-                    self.processing_times = data.get('processing_times', [])
-                    logger.info(f"Loaded {len(self.processing_times)} previous processing times for {self.model_name}")
-            except Exception as e:
-                logger.warning(f"Error loading processing times for {self.model_name}: {e}")
+        try:
+            times = load_processing_times(self.model_name, self.log_dir)
+        except Exception as e:
+            logger.warning(f"Error loading processing times for {self.model_name}: {e}")
+            return
+
+        if times:
+            self.processing_times = times
+            self._sorted_times = sorted(times)
+            self._mean_time = math.fsum(times) / len(times)
+            self._sum_sq_diff = math.fsum((t - self._mean_time) ** 2 for t in times)
+            logger.info(f"Loaded {len(self.processing_times)} previous processing times for {self.model_name}")
     
     def _get_times_file_path(self):
         """
@@ -77,13 +141,12 @@ class TimeEstimator:
         Returns:
             str: Path to the processing times file
         """
-        times_dir = os.path.join(self.log_dir, "processing_times")
+        times_file = get_times_file_path(self.model_name, self.log_dir)
+        times_dir = os.path.dirname(times_file)
         if not os.path.exists(times_dir):
             os.makedirs(times_dir)
         
-        from .llm_processor import sanitize_model_name
-        filename = f"{sanitize_model_name(self.model_name)}_times.json"
-        return os.path.join(times_dir, filename)
+        return times_file
     
     def start_entry(self):
         """
@@ -107,26 +170,30 @@ class TimeEstimator:
         self.processing_times.append(processing_time)
         self.current_index += 1
         self.remaining_entries -= 1
+
+        # Update the running mean and sum of squared differences (Welford's method)
+        bisect.insort(self._sorted_times, processing_time)
+        delta = processing_time - self._mean_time
+        self._mean_time += delta / len(self.processing_times)
+        self._sum_sq_diff += delta * (processing_time - self._mean_time)
         
-        # Save processing times
-        self._save_processing_times()
+        # Save processing time
+        self._save_processing_time(processing_time)
         
         # Return time statistics and estimates
         return self.get_estimates()
     
-    def _save_processing_times(self):
+    def _save_processing_time(self, processing_time):
         """
-        Save processing times to a file.
+        Append a processing time to the processing times file.
+
+        Args:
+            processing_time (float): Time taken by the last entry in seconds
         """
         times_file = self._get_times_file_path()
         try:
-            data = {
-                'model_name': self.model_name,
-                'processing_times': self.processing_times,
-                'last_updated': datetime.now().isoformat()
-            }
-            with open(times_file, 'w') as file:
-                json.dump(data, file, indent=2)
+            with open(times_file, 'ab') as file:
+                array('d', [processing_time]).tofile(file)
         except Exception as e:
             logger.warning(f"Error saving processing times for {self.model_name}: {e}")
     
@@ -150,9 +217,14 @@ class TimeEstimator:
             }
         
         # Calculate statistics
-        avg_time = mean(self.processing_times)
-        median_time = median(self.processing_times)
-        std_dev = stdev(self.processing_times) if len(self.processing_times) > 1 else 0
+        count = len(self._sorted_times)
+        middle = count // 2
+        avg_time = self._mean_time
+        if count % 2:
+            median_time = self._sorted_times[middle]
+        else:
+            median_time = (self._sorted_times[middle - 1] + self._sorted_times[middle]) / 2
+        std_dev = math.sqrt(self._sum_sq_diff / (count - 1)) if count > 1 else 0
         
         # Calculate elapsed and estimated times
         elapsed_time = time.time() - self.start_time
@@ -15,6 +15,18 @@ from .logger import Logger
 # Initialize logger
 logger = Logger()
 
+# Parse YAML with the libyaml bindings when PyYAML was built with them
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# Limits applied to every LLM request unless overridden in the llm section of common.yaml:
+# seconds to wait for a response, retries after a transient failure, and the
+# longest response in tokens (null for no limit)
+DEFAULT_LLM_LIMITS = {
+    'timeout': 600,
+    'max_retries': 2,
+    'max_output_tokens': 4096
+}
+
 
 def get_project_root():
     """
@@ -43,7 +55,7 @@ def load_yaml_config(file_path):
     """
     try:
         with open(file_path, 'r') as file:
-            return yaml.safe_load(file)
+            return yaml.load(file, Loader=YAML_LOADER)
     except FileNotFoundError:
         logger.error(f"Configuration file not found: {file_path}")
         raise
@@ -111,6 +123,9 @@ def load_config(machine_name=None):
     # Add models
     config['models'] = machine_config.get('models', {})
 
+    # Fill in request limits not set in the configuration
+    config['llm'] = {**DEFAULT_LLM_LIMITS, **(config.get('llm') or {})}
+
     # Resolve paths relative to project root
     if 'data' in config and 'base_dir' in config['data']:
         base_dir = config['data']['base_dir']
@@ -8,6 +8,8 @@ API calls, and response processing.
 
 import re
 import json
+import time
+import httpx
 import ollama
 
 from .logger import Logger
@@ -15,6 +17,25 @@ from .logger import Logger
 # Initialize logger
 logger = Logger()
 
+# Ollama client shared by all requests, created on first use with the configured timeout
+_client = None
+
+
+def get_ollama_client(config):
+    """
+    Returns the Ollama client for LLM requests, creating it on first use.
+
+    Args:
+        config (dict): Configuration parameters
+
+    Returns:
+        ollama.Client: Client whose requests time out after the configured number of seconds
+    """
+    global _client
+    if _client is None:
+        _client = ollama.Client(timeout=config['llm']['timeout'])
+    return _client
+
 
 def sanitize_model_name(model_name):
     """
@@ -170,6 +191,7 @@ def generate_prompt(code, filename, control_flow_info=None):
 def call_ollama_chat(model_name, custom_prompt, system_prompt, config):
     """
     Helper function to encapsulate the ollama.chat call with appropriate parameters.
+    The request times out and is retried as configured in the llm section.
 
     Args:
         model_name (str): Name of the model to use
@@ -198,6 +220,11 @@ def call_ollama_chat(model_name, custom_prompt, system_prompt, config):
         **ollama_options
     }
 
+    # Cap the response length unless the Ollama options already do
+    max_output_tokens = config['llm']['max_output_tokens']
+    if max_output_tokens:
+        options.setdefault("num_predict", max_output_tokens)
+
     # Log prompts in verbose mode
     if config.get('verbose', False):
         logger.separator("=", 80)
@@ -212,26 +239,39 @@ def call_ollama_chat(model_name, custom_prompt, system_prompt, config):
         logger.info(f"MODEL OPTIONS: {options}")
         logger.separator("=", 80)
 
-    try:
-        return ollama.chat(
-            model=model_name,
-            messages=[
-                {
-                    "role": "system",
-                    "content": system_prompt
-                },
-                {
-                    "role": "user",
-                    "content": custom_prompt
-                }
-            ],
-            options=options,
-            keep_alive=0,
-            stream=False
-        )
-    except Exception as e:
-        logger.error(f"Error calling Ollama API with model {model_name}: {e}")
-        raise
+    # Retry timeouts, connection errors and server errors, waiting longer each time
+    client = get_ollama_client(config)
+    max_retries = config['llm']['max_retries']
+    for attempt in range(max_retries + 1):
+        try:
+            return client.chat(
+                model=model_name,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": system_prompt
+                    },
+                    {
+                        "role": "user",
+                        "content": custom_prompt
+                    }
+                ],
+                options=options,
+                keep_alive=0,
+                stream=False
+            )
+        except (httpx.TransportError, ollama.ResponseError) as e:
+            transient = not isinstance(e, ollama.ResponseError) or e.status_code >= 500
+            if not transient or attempt == max_retries:
+                logger.error(f"Error calling Ollama API with model {model_name}: {e}")
+                raise
+            delay = 2 ** attempt
+            logger.warning(f"Error calling Ollama API with model {model_name}: {e}. "
+                           f"Retrying in {delay}s ({attempt + 1}/{max_retries})")
+        except Exception as e:
+            logger.error(f"Error calling Ollama API with model {model_name}: {e}")
+            raise
+        time.sleep(delay)
 
 
 def extract_fields(entry):
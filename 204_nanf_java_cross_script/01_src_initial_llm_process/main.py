@@ -21,6 +21,7 @@ import os
 import sys
 import json
 import argparse
+import itertools
 from datetime import datetime
 from colorama import Fore
 
@@ -28,7 +29,7 @@ from colorama import Fore
 from utils.config_loader import load_config
 from utils.logger import Logger
 from utils.data_handler import (
-    load_json_data, stream_json_data, ensure_directories, is_model_completed,
+    load_json_data, stream_json_data, count_json_entries, ensure_directories, is_model_completed,
     find_resume_point, write_to_json, save_resume_point, add_failed_entry,
     clear_failed_entries, reset_resume_point, get_failed_entries,
     update_incomplete_models_summary
@@ -81,6 +82,7 @@ class LLMVulProcessor:
 
         # Initialize data
         self.data = None
+        self.total_entries = None
         self.models = self.config['models']
         self.result_dir = self.config['output']['result_dir']
 
@@ -112,6 +114,23 @@ class LLMVulProcessor:
             self.config['data']['dataset_file']
         )
 
+    def get_total_entries(self):
+        """
+        Get the number of entries in the dataset.
+        Unless the dataset is already loaded, the entries are counted by streaming
+        the file, so it never has to be held in memory.
+
+        Returns:
+            int: Number of entries in the dataset
+        """
+        if self.total_entries is None:
+            if self.data is not None:
+                self.total_entries = len(self.data)
+            else:
+                self.total_entries = count_json_entries(self.get_dataset_path())
+                self.logger.info(f"Dataset contains {self.total_entries} entries")
+        return self.total_entries
+
     # process_model method removed as it's not used - we use process_model_streaming instead
     def _get_model_time_estimate(self, model_name):
         """
@@ -125,7 +144,7 @@ class LLMVulProcessor:
         """
         from utils.llm_processor import sanitize_model_name
 
-        total_entries = len(self.data)
+        total_entries = self.get_total_entries()
         log_dir = self.config['output']['log_dir']
 
         # Check if we have timing data for this model
@@ -163,9 +182,9 @@ class LLMVulProcessor:
                 time_per_entry = weighted_avg if weighted_avg > 0 else avg_time
 
                 # If model is not completed, estimate remaining time
-                completed, _ = is_model_completed(model_name, self.data, self.result_dir, log_dir)
+                completed, _ = is_model_completed(model_name, self.get_total_entries(), self.result_dir, log_dir)
                 if not completed:
-                    start_idx = find_resume_point(model_name, self.data, self.result_dir, log_dir)
+                    start_idx = find_resume_point(model_name, total_entries, self.result_dir, log_dir)
                     remaining = total_entries - start_idx
                     model_estimate = time_per_entry * remaining
                 else:
@@ -228,7 +247,7 @@ class LLMVulProcessor:
 
         for model_name in self.models.keys():
             # Check if model is already completed
-            completed, _ = is_model_completed(model_name, self.data, self.result_dir, log_dir)
+            completed, _ = is_model_completed(model_name, self.get_total_entries(), self.result_dir, log_dir)
             if completed:
                 # Get time estimate for this model (will return actual processing time for completed models)
                 model_estimate, avg_time, has_data, weighted_avg = self._get_model_time_estimate(model_name)
@@ -368,7 +387,7 @@ class LLMVulProcessor:
 
             for model_name in remaining_model_names:
                 # Check if model is already completed (we don't need the result since we get the time either way)
-                _, _ = is_model_completed(model_name, self.data, self.result_dir, self.config['output']['log_dir'])
+                _, _ = is_model_completed(model_name, self.get_total_entries(), self.result_dir, self.config['output']['log_dir'])
 
                 # Get time estimate for this model (will return actual processing time for completed models)
                 model_estimate, _, has_data, _ = self._get_model_time_estimate(model_name)
@@ -418,7 +437,7 @@ class LLMVulProcessor:
             bool: True if model has completed processing, False otherwise
         """
         log_dir = self.config['output']['log_dir']
-        completed, status_info = is_model_completed(model_name, self.data, self.result_dir, log_dir)
+        completed, status_info = is_model_completed(model_name, self.get_total_entries(), self.result_dir, log_dir)
 
         if completed:
             if status_info["max_retries_reached"] > 0:
@@ -657,7 +676,7 @@ class LLMVulProcessor:
             bool: True if model completed successfully, False otherwise
         """
         # Check if we've completed all entries
-        completed, status_info = is_model_completed(model_name, self.data, self.result_dir, log_dir)
+        completed, status_info = is_model_completed(model_name, self.get_total_entries(), self.result_dir, log_dir)
 
         # Get failed entries for detailed reporting
         failed_entries = get_failed_entries(model_name, log_dir)
@@ -750,17 +769,15 @@ class LLMVulProcessor:
         log_dir = self.config['output']['log_dir']
 
         # Count total entries (we need this for progress tracking)
-        # This is a one-time operation that still reads the whole file, but doesn't keep it in memory
-        if self.data is None:
-            self.load_data()  # This is inefficient but needed for compatibility with other methods
-        total_entries = len(self.data)
+        # The count is saved next to the dataset, so this only parses the file once
+        total_entries = self.get_total_entries()
 
         # Skip if model has completed all entries
         if self._check_model_completion(model_name, total_entries):
             return True
 
         # Find resume point
-        start_idx = find_resume_point(model_name, self.data, self.result_dir, log_dir)
+        start_idx = find_resume_point(model_name, total_entries, self.result_dir, log_dir)
         remaining = total_entries - start_idx
 
         self.logger.info(f"Resuming {model_name} from index {start_idx}/{total_entries} "
@@ -775,12 +792,13 @@ class LLMVulProcessor:
         # Get the maximum retry count from config
         max_retries = self.config.get('processing', {}).get('max_retries', 3)
 
-        # Stream the JSON data
-        for idx, entry in enumerate(stream_json_data(dataset_path)):
-            # Skip entries before the resume point
-            if idx < start_idx:
-                continue
-
+        # Stream the JSON data, starting at the resume point; entries before it
+        # are dropped straight from the parser without going through the loop
+        entries = enumerate(
+            itertools.islice(stream_json_data(dataset_path), start_idx, None),
+            start=start_idx
+        )
+        for idx, entry in entries:
             # Process this entry with retry mechanism
             # We always continue to the next entry, even if this one fails
             # since we now handle max retries by creating an empty response
@@ -805,7 +823,7 @@ class LLMVulProcessor:
 
         # Ensure the global time tracker has accurate data for all completed models
         for model_name in self.models.keys():
-            completed, _ = is_model_completed(model_name, self.data, self.result_dir, log_dir)
+            completed, _ = is_model_completed(model_name, self.get_total_entries(), self.result_dir, log_dir)
             if completed:
                 model_estimate, _, has_data, _ = self._get_model_time_estimate(model_name)
                 if has_data:
@@ -923,9 +941,6 @@ class LLMVulProcessor:
         Returns:
             int: Number of completed models
         """
-        if self.data is None:
-            self.load_data()
-
         total_models = len(self.models)
         completed_models = 0
 
@@ -967,9 +982,6 @@ class LLMVulProcessor:
                 self.logger.section("Verbose mode enabled - detailed prompt information will be displayed")
             self.logger.separator()
 
-            # Load data
-            self.load_data()
-
             # Process all models
             completed_models = self.process_all_models()
             total_models = len(self.models)
@@ -8,6 +8,7 @@ This module handles loading, saving, and processing data files.
 import os
 import json
 from datetime import datetime
+import ijson
 from .logger import Logger
 from .llm_processor import sanitize_model_name
 
@@ -18,7 +19,8 @@ logger = Logger()
 def stream_json_data(file_path):
     """
     Stream a JSON array file, yielding one object at a time.
-    This is a memory-efficient way to process large JSON arrays.
+    This is a memory-efficient way to process large JSON arrays: the file is
+    parsed incrementally, so only the current object is held in memory.
 
     Args:
         file_path (str): The path to the JSON file to be streamed.
@@ -28,57 +30,32 @@ def stream_json_data(file_path):
 
     Raises:
         FileNotFoundError: If the JSON file does not exist at the specified path.
-        json.JSONDecodeError: If the file is not a valid JSON.
+        ijson.JSONError: If the file is not a valid JSON.
         ValueError: If the JSON is not an array.
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
+        with open(file_path, 'rb') as file:
             # Read the first character to verify it's an array
             first_char = file.read(1)
-            if first_char != '[':
+            if first_char != b'[':
                 raise ValueError(f"JSON file {file_path} is not an array (doesn't start with '[')")
 
             # Reset file position
             file.seek(0)
 
-            # Create a JSON decoder
-            decoder = json.JSONDecoder()
-
-            # Skip the opening bracket and any whitespace
-            content = file.read()
-            idx = content.find('[') + 1
-            content = content[idx:].lstrip()
-
             # Keep track of objects yielded
             count = 0
 
-            # Parse objects until we reach the end of the array
-            while content:
-                try:
-                    # Decode one object at a time
-                    obj, idx = decoder.raw_decode(content)
-                    yield obj
-                    count += 1
-
-                    # Move past the object and any whitespace/comma
-                    content = content[idx:].lstrip()
-                    if content.startswith(','):
-                        content = content[1:].lstrip()
-
-                    # If we've reached the end of the array, break
-                    if content.startswith(']'):
-                        break
-                except json.JSONDecodeError as e:
-                    # If we can't decode any more objects, we're done
-                    if "Expecting value" in str(e) and content.strip().startswith(']'):
-                        break
-                    raise
+            # Parse the array one element at a time
+            for obj in ijson.items(file, 'item', use_float=True):
+                yield obj
+                count += 1
 
             logger.info(f"Successfully streamed {count} objects from {file_path}")
     except FileNotFoundError:
         logger.error(f"File not found: {file_path}")
         raise
-    except json.JSONDecodeError as e:
+    except ijson.JSONError as e:
         logger.error(f"Error decoding JSON from {file_path}: {e}")
         raise
     except Exception as e:
@@ -86,6 +63,42 @@ def stream_json_data(file_path):
         raise
 
 
+def count_json_entries(file_path):
+    """
+    Count the objects in a JSON array file without keeping them in memory.
+    The count is saved next to the file in <file>.count together with the file's
+    size and modification time, so the file is only parsed again after it changes.
+
+    Args:
+        file_path (str): The path to the JSON file to be counted.
+
+    Returns:
+        int: Number of objects in the array.
+    """
+    count_file = f"{file_path}.count"
+    stat = os.stat(file_path)
+
+    try:
+        with open(count_file, 'r') as file:
+            cached = json.load(file)
+        if cached.get('size') == stat.st_size and cached.get('mtime_ns') == stat.st_mtime_ns:
+            return cached['count']
+    except FileNotFoundError:
+        pass
+    except (ValueError, KeyError, AttributeError) as e:
+        logger.warning(f"Ignoring invalid entry count file {count_file}: {e}")
+
+    count = sum(1 for _ in stream_json_data(file_path))
+
+    try:
+        with open(count_file, 'w') as file:
+            json.dump({'count': count, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}, file)
+    except OSError as e:
+        logger.warning(f"Could not save entry count to {count_file}: {e}")
+
+    return count
+
+
 def load_json_data(file_path):
     """
     Load and parse a JSON file into a Python list.
@@ -100,7 +113,7 @@ def load_json_data(file_path):
 
     Raises:
         FileNotFoundError: If the JSON file does not exist at the specified path.
-        json.JSONDecodeError: If the file is not a valid JSON.
+        ijson.JSONError: If the file is not a valid JSON.
     """
     try:
         # Use the streaming function but collect all objects into a list
@@ -110,7 +123,7 @@ def load_json_data(file_path):
     except FileNotFoundError:
         logger.error(f"File not found: {file_path}")
         raise
-    except json.JSONDecodeError as e:
+    except ijson.JSONError as e:
         logger.error(f"Error decoding JSON from {file_path}: {e}")
         raise
     except Exception as e:
@@ -353,7 +366,7 @@ def get_resume_data(model_name, log_dir):
     return None
 
 
-def is_model_completed(model_name, _ori_json_data, result_dir, log_dir=None):
+def is_model_completed(model_name, _total_entries, result_dir, log_dir=None):
     """
     Checks if a model has completed processing all entries.
     Only checks the dedicated resume point file.
@@ -364,7 +377,7 @@ def is_model_completed(model_name, _ori_json_data, result_dir, log_dir=None):
 
     Args:
         model_name (str): Name of the model to check
-        _ori_json_data (list): Original JSON data (unused, kept for API compatibility)
+        _total_entries (int): Number of entries in the dataset (unused, kept for API compatibility)
         result_dir (str): Directory containing result files
         log_dir (str, optional): Directory for log files
 
@@ -439,14 +452,14 @@ def is_model_completed(model_name, _ori_json_data, result_dir, log_dir=None):
     return False, status_info
 
 
-def find_resume_point(model_name, ori_json_data, result_dir, log_dir=None):
+def find_resume_point(model_name, total_entries, result_dir, log_dir=None):
     """
     Finds the index to resume processing from.
     Only checks the dedicated resume point file.
 
     Args:
         model_name (str): Name of the model
-        ori_json_data (list): Original JSON data (used only for length validation)
+        total_entries (int): Number of entries in the dataset (used only for validation)
         result_dir (str): Directory containing result files
         log_dir (str, optional): Directory for log files
 
@@ -459,7 +472,7 @@ def find_resume_point(model_name, ori_json_data, result_dir, log_dir=None):
         if resume_data and "index" in resume_data:
             index = resume_data["index"]
             # Ensure the index is valid
-            if 0 <= index <= len(ori_json_data):
+            if 0 <= index <= total_entries:
                 logger.info(f"Resuming {model_name} from index {index} based on resume file")
                 return index
 